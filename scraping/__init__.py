@@ -0,0 +1,6 @@
+"""
+Webscraping do SIGAA para o módulo SIMATe do AdminDEP.
+
+Os módulos do pacote não importam o Playwright no carregamento: ele só é iniciado pela linha de
+comando (`python -m scraping`) quando o subcomando precisa abrir o navegador.
+"""
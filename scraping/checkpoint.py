@@ -0,0 +1,129 @@
+import os
+import json
+import hashlib
+from datetime import datetime
+
+
+# Parâmetros que não identificam a consulta (credenciais e controle da execução)
+PARAMETROS_IGNORADOS = (
+    'userData', 'consultas', 'checkpoint', 'formatoSaida', 'headless',
+    'gravarHar', 'reproduzirHar', 'perfilamento', '_diretorioPerfil'
+)
+
+
+def chave_consulta(params):
+    """
+    Gera uma chave estável que identifica uma sub-consulta pelos seus filtros.
+
+    Parâmetros:
+        params (dict): Parâmetros da sub-consulta. As chaves listadas em PARAMETROS_IGNORADOS
+            (como o cookie 'userData') são desconsideradas, de modo que a chave continua válida
+            mesmo após a renovação do cookie.
+
+    Retorno:
+        str: Hash SHA-256 (hexadecimal) dos filtros serializados de forma canônica.
+    """
+    filtros = {k: v for k, v in params.items() if k not in PARAMETROS_IGNORADOS}
+    serializado = json.dumps(filtros, sort_keys=True, ensure_ascii=False)
+    return hashlib.sha256(serializado.encode('utf-8')).hexdigest()
+
+
+def hash_resultado(resultado):
+    """
+    Calcula o hash SHA-256 do resultado de uma sub-consulta, ignorando os logs.
+
+    Parâmetros:
+        resultado (dict): Resultado retornado por `extrair_dados_tabela`.
+
+    Retorno:
+        str: Hash SHA-256 (hexadecimal) do resultado serializado de forma canônica.
+    """
+    dados = {k: v for k, v in resultado.items() if k != 'logs'}
+    serializado = json.dumps(dados, sort_keys=True, ensure_ascii=False)
+    return hashlib.sha256(serializado.encode('utf-8')).hexdigest()
+
+
+def ler_checkpoint(caminho):
+    """
+    Lê os registros de sub-consultas concluídas de um arquivo de checkpoint.
+
+    O arquivo é um JSON Lines em que cada linha registra uma sub-consulta concluída. Como cada linha
+    é gravada de uma só vez, o arquivo pode ser lido enquanto a coleta ainda está em andamento.
+    Linhas incompletas (por exemplo, quando o processo foi interrompido no meio de uma gravação)
+    são ignoradas.
+
+    Parâmetros:
+        caminho (str): Caminho do arquivo de checkpoint.
+
+    Retorno:
+        list: Lista de registros (dict) com as chaves 'chave', 'filtros', 'hash', 'concluidoEm' e 'resultado'.
+        Retorna uma lista vazia se o arquivo ainda não existir.
+    """
+    registros = []
+    if not os.path.exists(caminho):
+        return registros
+
+    with open(caminho, 'r', encoding='utf-8') as arquivo:
+        for linha in arquivo:
+            linha = linha.strip()
+            if not linha:
+                continue
+            try:
+                registros.append(json.loads(linha))
+            except json.JSONDecodeError:
+                continue
+    return registros
+
+
+def carregar_concluidas(caminho):
+    """
+    Retorna as sub-consultas já concluídas indexadas pela sua chave.
+
+    Parâmetros:
+        caminho (str): Caminho do arquivo de checkpoint.
+
+    Retorno:
+        dict: Dicionário no formato {chave: registro}.
+    """
+    return {registro['chave']: registro for registro in ler_checkpoint(caminho) if 'chave' in registro}
+
+
+def registrar_consulta(caminho, params, resultado):
+    """
+    Acrescenta ao checkpoint o registro de uma sub-consulta concluída.
+
+    A linha é gravada e sincronizada com o disco (fsync) antes do retorno, para que uma falha
+    posterior não descarte o trabalho já feito.
+
+    Parâmetros:
+        caminho (str): Caminho do arquivo de checkpoint.
+        params (dict): Parâmetros da sub-consulta concluída.
+        resultado (dict): Resultado retornado por `extrair_dados_tabela`.
+
+    Retorno:
+        dict: O registro gravado.
+    """
+    registro = {
+        'chave': chave_consulta(params),
+        'filtros': {k: v for k, v in params.items() if k not in PARAMETROS_IGNORADOS},
+        'hash': hash_resultado(resultado),
+        'concluidoEm': datetime.now().isoformat(timespec='seconds'),
+        'resultado': {k: v for k, v in resultado.items() if k != 'logs'}
+    }
+
+    diretorio = os.path.dirname(caminho)
+    if diretorio:
+        os.makedirs(diretorio, exist_ok=True)
+
+    with open(caminho, 'a+b') as arquivo:
+        # Se a última gravação foi interrompida, começar o registro em uma nova linha
+        arquivo.seek(0, os.SEEK_END)
+        if arquivo.tell() > 0:
+            arquivo.seek(-1, os.SEEK_END)
+            if arquivo.read(1) != b'\n':
+                arquivo.write(b'\n')
+        arquivo.write((json.dumps(registro, ensure_ascii=False) + '\n').encode('utf-8'))
+        arquivo.flush()
+        os.fsync(arquivo.fileno())
+
+    return registro
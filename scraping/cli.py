@@ -0,0 +1,300 @@
+import os
+import sys
+import json
+import importlib
+import subprocess
+from time import perf_counter
+from statistics import median
+from .core import invalido, exigir_sessao, validar_numero
+
+
+USO = """Uso: python -m scraping <subcomando> '<parâmetros em JSON>'
+
+Subcomandos:
+    turmas        Consulta turmas (ver webscraping.main e webscraping.executar_consultas).
+    demandas      Gera o relatório de alunos aptos (ver webscrapingDemandas.main e executar_componentes).
+    login         Autentica no SIGAA e retorna o cookie JSESSIONID (ver webscrapingAutentication.main).
+    vagas         Monitora a quantidade de alunos das turmas (ver webscrapingVagas.main).
+    exportar      Exporta turmas ou demandas para Parquet/Arrow (ver exportacao.exportar).
+    checkpoint    Exibe os resultados parciais de uma coleta com checkpoint.
+    indice        Exibe a demanda agregada de um índice de alunos aptos.
+    fila          Enfileira tarefas de turmas/demandas e executa trabalhadores (ver fila.main).
+    inicializacao Mede o tempo de inicialização de cada subcomando, até o navegador ficar pronto.
+"""
+
+
+def executar_com_playwright(funcao, params):
+    """
+    Inicia o Playwright e executa uma das funções `main` (com perfilamento opcional).
+
+    O Playwright só é importado aqui, após a validação de 'perfilamento', de modo que parâmetros
+    inválidos e resultados já gravados retornam sem carregá-lo.
+    """
+    from .perfilamento import executar_com_perfil, validar_perfilamento
+
+    erro = validar_perfilamento(params)
+    if erro:
+        return erro
+
+    from playwright.sync_api import sync_playwright
+
+    with sync_playwright() as playwright:
+        return executar_com_perfil(funcao, playwright, params)
+
+
+def executar_turmas(params):
+    from . import webscraping
+
+    erro = webscraping.validar_turmas(params)
+    if erro:
+        return erro
+
+    if 'consultas' in params:
+        if webscraping.consultas_pendentes(params) == 0:
+            # Todas as sub-consultas já constam no checkpoint: não é preciso abrir o navegador
+            return webscraping.executar_consultas(None, params)
+        return exigir_sessao(params) or executar_com_playwright(webscraping.executar_consultas, params)
+
+    return exigir_sessao(params) or executar_com_playwright(webscraping.main, params)
+
+
+def executar_demandas(params):
+    from . import webscrapingDemandas
+
+    erro = webscrapingDemandas.validar_demandas(params)
+    if erro:
+        return erro
+
+    if 'componentesCurriculares' in params:
+        return exigir_sessao(params) or executar_com_playwright(webscrapingDemandas.executar_componentes, params)
+    return exigir_sessao(params) or executar_com_playwright(webscrapingDemandas.main, params)
+
+
+def executar_login(params):
+    from . import webscrapingAutentication
+
+    if not params.get('login') or not params.get('password'):
+        return invalido("informe 'login' e 'password'.")
+    return executar_com_playwright(webscrapingAutentication.main, params)
+
+
+def executar_vagas(params):
+    from . import webscrapingVagas
+
+    return (
+        validar_numero(params, 'intervalo', 30, 0, estrito=True)
+        or validar_numero(params, 'intervaloMaximo', 300, 0, estrito=True)
+        or validar_numero(params, 'fatorBackoff', 2, 1)
+        or validar_numero(params, 'maxErrosSeguidos', 3, 1, inteiro=True)
+        or validar_numero(params, 'maxConsultas', None, 1, inteiro=True)
+        or exigir_sessao(params)
+        or executar_com_playwright(webscrapingVagas.main, params)
+    )
+
+
+def executar_exportar(params):
+    from .exportacao import exportar
+
+    return exportar(params)
+
+
+def executar_checkpoint(params):
+    from .checkpoint import ler_checkpoint
+
+    if not params.get('checkpoint'):
+        return invalido("informe o arquivo em 'checkpoint'.")
+    registros = ler_checkpoint(params['checkpoint'])
+    return {
+        'resultado': {
+            'consultasConcluidas': len(registros),
+            'consultas': registros
+        },
+        'status': 200
+    }
+
+
+def executar_indice(params):
+    from .indiceAptos import IndiceAlunosAptos
+
+    if not params.get('indice') or not os.path.exists(params['indice']):
+        return invalido("informe em 'indice' um arquivo gravado por executar_componentes.")
+
+    componentes = params.get('componentes')
+    if componentes is not None and (not isinstance(componentes, list) or not all(isinstance(componente, str) for componente in componentes)):
+        return invalido("'componentes' deve ser uma lista de componentes curriculares.")
+
+    indice = IndiceAlunosAptos.carregar(params['indice'])
+    if componentes:
+        resultado = {
+            'componentes': componentes,
+            'alunos': indice.sobreposicao(*componentes),
+            'matriculas': indice.alunos(*componentes)
+        }
+    else:
+        resultado = indice.resumo()
+    return {
+        'resultado': resultado,
+        'status': 200
+    }
+
+
+def executar_fila(params):
+    from . import fila
+
+    return fila.main(params)
+
+
+# Módulo carregado por cada subcomando que usa o navegador
+MODULOS_NAVEGADOR = {
+    'turmas': 'webscraping',
+    'demandas': 'webscrapingDemandas',
+    'login': 'webscrapingAutentication',
+    'vagas': 'webscrapingVagas'
+}
+
+
+def medir_etapas(subcomando, navegador=True):
+    """
+    Executada em um processo novo por `executar_inicializacao`: carrega o módulo do subcomando e o
+    Playwright e, opcionalmente, abre o navegador, imprimindo a duração de cada etapa como JSON.
+
+    A linha é impressa assim que o navegador fica pronto, antes de fechá-lo, para que o processo pai
+    meça o tempo total até esse ponto.
+    """
+    inicio = perf_counter()
+    etapas = {}
+
+    importlib.import_module(f".{MODULOS_NAVEGADOR[subcomando]}", __package__)
+    etapas['moduloMs'] = round((perf_counter() - inicio) * 1000, 1)
+
+    from playwright.sync_api import sync_playwright
+    etapas['playwrightMs'] = round((perf_counter() - inicio) * 1000, 1)
+
+    if not navegador:
+        print(json.dumps(etapas), flush=True)
+        return
+
+    from .core import abrir_navegador
+
+    playwright = sync_playwright().start()
+    try:
+        browser = abrir_navegador(playwright, {'headless': True})
+        etapas['navegadorMs'] = round((perf_counter() - inicio) * 1000, 1)
+        print(json.dumps(etapas), flush=True)
+        browser.close()
+    finally:
+        playwright.stop()
+
+
+def executar_inicializacao(params):
+    """
+    Mede o tempo de inicialização a frio de cada subcomando que usa o navegador.
+
+    Cada medição é feita em um novo processo Python (ver `medir_etapas`), que carrega o pacote, o módulo
+    do subcomando e o `playwright.sync_api` e abre o Chromium sem interface gráfica. O tempo total vai
+    da criação do processo até o navegador ficar pronto; as etapas são acumuladas a partir do início
+    de `medir_etapas`, após o carregamento do interpretador e de `cli`.
+
+    Parâmetros:
+        params (dict): Dicionário contendo os parâmetros para a execução, com possíveis chaves:
+            - 'repeticoes' (int): Quantas vezes cada subcomando é medido (padrão: 5).
+            - 'navegador' (bool): Se falso, a medição termina após o carregamento do Playwright (padrão: True).
+            - 'subcomandos' (list): Subcomandos a medir (padrão: todos os que usam o navegador).
+
+    Retorno:
+        dict: Para cada subcomando, o mínimo e a mediana do tempo total e a mediana de cada etapa, em
+        milissegundos. O status é 500 se alguma medição falhar (por exemplo, sem o Chromium instalado).
+    """
+    repeticoes = int(params.get('repeticoes', 5))
+    navegador = bool(params.get('navegador', True))
+    subcomandos = params.get('subcomandos', list(MODULOS_NAVEGADOR))
+    if not isinstance(subcomandos, list) or not all(subcomando in MODULOS_NAVEGADOR for subcomando in subcomandos):
+        return invalido(f"'subcomandos' deve ser uma lista com valores entre {list(MODULOS_NAVEGADOR)}.")
+
+    raiz = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+    tempos = {}
+
+    for subcomando in subcomandos:
+        totais = []
+        etapas = []
+        for _ in range(repeticoes):
+            inicio = perf_counter()
+            processo = subprocess.Popen(
+                [sys.executable, '-c', f"from scraping.cli import medir_etapas; medir_etapas({subcomando!r}, {navegador!r})"],
+                cwd=raiz, stdout=subprocess.PIPE, stderr=subprocess.PIPE, text=True
+            )
+            linha = processo.stdout.readline()
+            total = (perf_counter() - inicio) * 1000
+            _, erros = processo.communicate()
+            if processo.returncode != 0 or not linha:
+                return {
+                    'resultado': f"Falha ao medir o subcomando '{subcomando}': {erros.strip().splitlines()[-1] if erros.strip() else 'sem saída'}",
+                    'status': 500
+                }
+            totais.append(total)
+            etapas.append(json.loads(linha))
+
+        tempos[subcomando] = {
+            'minimoMs': round(min(totais), 1),
+            'medianaMs': round(median(totais), 1),
+            'etapasMs': {etapa: median(medicao[etapa] for medicao in etapas) for etapa in etapas[0]}
+        }
+
+    return {
+        'resultado': tempos,
+        'status': 200
+    }
+
+
+SUBCOMANDOS = {
+    'turmas': executar_turmas,
+    'demandas': executar_demandas,
+    'login': executar_login,
+    'vagas': executar_vagas,
+    'exportar': executar_exportar,
+    'checkpoint': executar_checkpoint,
+    'indice': executar_indice,
+    'fila': executar_fila,
+    'inicializacao': executar_inicializacao
+}
+
+
+def principal(argumentos=None):
+    """
+    Ponto de entrada da linha de comando.
+
+    Os parâmetros de cada subcomando são passados como um único argumento em JSON, e o resultado é
+    impresso como JSON na saída padrão.
+
+    Exemplo de uso via CLI:
+        python -m scraping login '{"login": "SEU USER", "password": "SUA SENHA"}'
+        python -m scraping turmas '{"userData": "JSSESSION COOKIE AQUI", "departamento": "DEPARTAMENTO DE COMPUTAÇÃO - São Cristóvão", "nomeComponente": "ARQUITETURA DE COMPUTADORES"}'
+        python -m scraping demandas '{"userData": "JSSESSION COOKIE AQUI", "componenteCurricular": "COMP0415", "anoPeriodoIngresso": "2020.1"}'
+
+    Retorno:
+        int: Código de saída do processo (2 para subcomando desconhecido).
+    """
+    argumentos = sys.argv[1:] if argumentos is None else argumentos
+
+    if not argumentos or argumentos[0] not in SUBCOMANDOS:
+        print(USO, file=sys.stderr)
+        return 2
+
+    subcomando = argumentos[0]
+    try:
+        params = json.loads(argumentos[1] if len(argumentos) > 1 else '{}')
+    except json.JSONDecodeError as e:
+        params = None
+        resultado = invalido(f"JSON inválido ({e}).")
+
+    if params is not None:
+        if isinstance(params, dict):
+            resultado = SUBCOMANDOS[subcomando](params)
+        else:
+            resultado = invalido("os parâmetros devem ser um objeto JSON.")
+
+    if isinstance(params, dict) and params.get('formatoSaida') == 'compacto':
+        print(json.dumps(resultado, separators=(',', ':')))
+    else:
+        print(json.dumps(resultado))
+    return 0
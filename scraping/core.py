@@ -0,0 +1,253 @@
+import os
+from .perfilamento import iniciar_trace, parar_trace
+
+
+def invalido(mensagem):
+    """
+    Monta o retorno de parâmetros inválidos, no mesmo formato das funções `main`.
+
+    Usada pela linha de comando e pela validação dos parâmetros de cada script (ex.: `webscraping.validar_turmas`).
+    """
+    return {
+        'resultado': f"Parâmetros inválidos: {mensagem}",
+        'status': 400
+    }
+
+
+def exigir_sessao(params):
+    """
+    Retorna a mensagem de erro se não houver cookie de sessão nem HAR para reprodução.
+    """
+    if not params.get('userData') and not params.get('reproduzirHar'):
+        return invalido("informe o cookie de sessão em 'userData'.")
+    return None
+
+
+def validar_numero(params, chave, padrao, minimo, inteiro=False, estrito=False):
+    """
+    Valida um parâmetro numérico opcional antes de iniciar o Playwright.
+
+    Usada pela linha de comando e por `perfilamento.validar_perfilamento`.
+
+    Parâmetros:
+        params (dict): Parâmetros do subcomando.
+        chave (str): Chave do parâmetro.
+        padrao (float or None): Valor usado se a chave não for informada (None dispensa a validação).
+        minimo (float): Menor valor aceito.
+        inteiro (bool): Se verdadeiro, exige um número inteiro.
+        estrito (bool): Se verdadeiro, o próprio mínimo não é aceito.
+
+    Retorno:
+        dict or None: O retorno de parâmetros inválidos (ver `invalido`), ou None se o valor for válido.
+    """
+    valor = params.get(chave, padrao)
+    if valor is None:
+        return None
+    try:
+        if isinstance(valor, bool) or (inteiro and int(valor) != float(valor)):
+            raise ValueError
+        valor = float(valor)
+    except (TypeError, ValueError):
+        return invalido(f"'{chave}' deve ser um número{' inteiro' if inteiro else ''}.")
+    if valor < minimo or (estrito and valor == minimo):
+        return invalido(f"'{chave}' deve ser {'maior que' if estrito else 'maior ou igual a'} {minimo}.")
+    return None
+
+
+def abrir_navegador(playwright, params):
+    """
+    Abre o navegador Chromium usado pelos scripts.
+
+    Parâmetros:
+        playwright (object): Instância do Playwright para automação de navegador.
+        params (dict): Parâmetros da execução. A chave opcional 'headless' (bool, padrão False) executa
+            o navegador sem interface gráfica, como em execuções de CI.
+
+    Retorno:
+        object: Instância do navegador aberto.
+    """
+    return playwright.chromium.launch(headless=params.get('headless', False))
+
+
+def criar_contexto(browser, params, logs):
+    """
+    Cria o contexto do navegador, configurando a gravação ou a reprodução de HAR quando solicitado
+    e iniciando o tracing do Playwright quando a execução estiver sendo perfilada.
+
+    No modo de gravação, toda a troca de rede da execução é salva em um arquivo HAR, que pode ser usado
+    para reproduzir uma coleta problemática depois que as páginas do SIGAA mudarem. No modo de reprodução,
+    as respostas são servidas a partir do HAR pelo roteamento do Playwright, sem acesso à rede: requisições
+    que não estiverem no HAR são abortadas.
+
+    Parâmetros:
+        browser (object): Instância do navegador.
+        params (dict): Parâmetros da execução, com possíveis chaves:
+            - 'gravarHar' (str): Caminho do arquivo HAR (.har ou .zip) a ser gravado.
+            - 'reproduzirHar' (str): Caminho do arquivo HAR a partir do qual as respostas serão servidas.
+        logs (list): Lista para armazenar mensagens de log durante a execução da função.
+
+    Retorno:
+        object: O contexto criado.
+
+    Observação:
+        O HAR só é gravado no disco quando o contexto é fechado, por isso os scripts devem encerrar
+        o contexto com `fechar_contexto`. A gravação da autenticação inclui a senha enviada no formulário.
+    """
+    gravarHar = params.get('gravarHar', '')
+    reproduzirHar = params.get('reproduzirHar', '')
+
+    if gravarHar:
+        context = browser.new_context(record_har_path=gravarHar)
+        logs.append(f"Gravando a troca de rede em '{gravarHar}'.")
+    else:
+        context = browser.new_context()
+
+    if reproduzirHar:
+        context.route_from_har(reproduzirHar, not_found='abort')
+        logs.append(f"Reproduzindo as respostas de '{reproduzirHar}', sem acesso à rede.")
+
+    iniciar_trace(context, params, logs)
+
+    return context
+
+
+def caminho_har(caminho, sufixo):
+    """
+    Acrescenta um sufixo ao nome de um arquivo HAR, antes da extensão.
+
+    Usada pelas execuções que abrem vários contextos (sub-consultas, componentes, tarefas da fila),
+    já que cada contexto grava o seu HAR ao ser fechado e sobrescreveria o dos anteriores.
+
+    Exemplo de uso:
+        caminho_har('data/coleta.har', 'consulta-0')
+        # retorno será: 'data/coleta-consulta-0.har'
+    """
+    if not caminho:
+        return caminho
+    raiz, extensao = os.path.splitext(caminho)
+    return f"{raiz}-{sufixo}{extensao}"
+
+
+def separar_har(params, sufixo):
+    """
+    Retorna os parâmetros com 'gravarHar' e 'reproduzirHar' acrescidos do sufixo (ver `caminho_har`).
+
+    Como a gravação e a reprodução usam o mesmo sufixo, uma coleta gravada com 'gravarHar' é reproduzida
+    ao executá-la novamente com o mesmo caminho em 'reproduzirHar'.
+    """
+    params = dict(params)
+    for chave in ('gravarHar', 'reproduzirHar'):
+        if params.get(chave):
+            params[chave] = caminho_har(params[chave], sufixo)
+    return params
+
+
+def fechar_contexto(context, params, logs):
+    """
+    Fecha o contexto do navegador, gravando o HAR e o trace do Playwright no disco se estiverem ativos.
+
+    Erros ao fechar são registrados nos logs e não interrompem a execução, já que esta função também
+    é chamada nos caminhos de erro dos scripts.
+
+    Parâmetros:
+        context (object): Contexto do navegador, ou None se ainda não tiver sido criado.
+        params (dict): Parâmetros da execução.
+        logs (list): Lista para armazenar mensagens de log durante a execução da função.
+    """
+    if context is None:
+        return
+    try:
+        parar_trace(context, params, logs)
+    except Exception as e:
+        logs.append(f"Erro ao gravar o trace do Playwright: {e}")
+    try:
+        context.close()
+    except Exception as e:
+        logs.append(f"Erro ao fechar o contexto do navegador: {e}")
+
+
+def fechar_navegador(browser, logs):
+    """
+    Fecha o navegador, se tiver sido aberto.
+
+    Chamada no bloco `finally` das funções `main`, para que nenhum caminho de erro deixe um processo do
+    Chromium aberto quando o Playwright é reaproveitado entre execuções (como nos trabalhadores da fila).
+    Erros ao fechar são registrados nos logs e não interrompem a execução.
+
+    Parâmetros:
+        browser (object): Instância do navegador, ou None se ainda não tiver sido aberto.
+        logs (list): Lista para armazenar mensagens de log durante a execução da função.
+    """
+    if browser is None:
+        return
+    try:
+        browser.close()
+    except Exception as e:
+        logs.append(f"Erro ao fechar o navegador: {e}")
+
+
+def abrir_pagina_autenticada(context, params, logs):
+    """
+    Adiciona o cookie de sessão do SIGAA ao contexto e abre uma nova página.
+
+    Parâmetros:
+        context (object): Contexto do navegador.
+        params (dict): Parâmetros da execução. A chave 'userData' (str) contém o cookie JSESSIONID do usuário no SIGAA.
+        logs (list): Lista para armazenar mensagens de log durante a execução da função.
+
+    Retorno:
+        object: A página criada.
+    """
+    context.add_cookies([
+        {
+            'name': 'JSESSIONID',
+            'value': params.get('userData', ''),
+            'domain': 'www.sigaa.ufs.br',
+            'path': '/'
+        }
+    ])
+
+    # Criar uma nova página e navegar para o site com os cookies
+    page = context.new_page()
+    logs.append("Abriu o navegador.")
+    return page
+
+
+def obter_erros(page):
+    """
+    Obtém as mensagens de erro ou aviso exibidas em um painel da página.
+
+    A função tenta localizar um painel de erros representado por um <div> com o id 'painel-erros' e contendo uma 
+    lista desordenada (<ul>) com a classe 'erros' ou 'warning'. Se encontrar essas mensagens, as concatena em uma única string.
+
+    Parâmetros:
+        page (objeto): Objeto da página web que permite a interação com o conteúdo.
+
+    Retorno:
+        str: Mensagens de erro ou aviso concatenadas em uma string. Retorna "Nenhum erro encontrado." se nenhum erro for localizado.
+    
+    Exceções:
+        Retorna "Nenhum erro encontrado." em caso de exceção durante a execução.
+    """
+    try:
+        # Esperar até que uma <ul> com a classe "erros" ou "warning" esteja visível
+        page.locator("div[id='painel-erros'] ul.erros, div[id='painel-erros'] ul.warning").wait_for(state='visible', timeout=1000) 
+
+        # Tentar localizar a <ul> com a classe "erros"
+        ul_element = page.locator("div[id='painel-erros'] ul.erros")
+        
+        # Se não encontrar, tentar localizar a <ul> com a classe "warning"
+        if ul_element.count() == 0:
+            ul_element = page.locator("div[id='painel-erros'] ul.warning")
+        
+        # Verificar se a <ul> foi encontrada e se contém itens <li>
+        if ul_element.count() > 0:
+            erros_texto = [li.inner_text() for li in ul_element.locator('li').all()]
+            if erros_texto:
+                # Concatenar erros em uma única string, separados por ". "
+                return '. '.join(erros_texto)
+        return "Nenhum erro encontrado."
+    
+    except Exception as e:
+        # Caso ocorra algum erro, retornar uma mensagem padrão
+        return "Nenhum erro encontrado."
@@ -0,0 +1,374 @@
+import re
+import csv
+import json
+from .webscraping import obterProfessoresCargaHoraria
+from .registros import expandir_compacto
+
+
+# Quantidade padrão de linhas por row group (Parquet) ou record batch (Arrow IPC)
+TAMANHO_LOTE = 10000
+
+
+def importar_pyarrow():
+    """
+    Importa o pyarrow sob demanda, já que ele só é necessário para a exportação colunar.
+
+    Retorno:
+        tuple: Os módulos `pyarrow` e `pyarrow.parquet`.
+
+    Exceções:
+        ImportError: Se o pyarrow não estiver instalado.
+    """
+    try:
+        import pyarrow
+        import pyarrow.parquet
+    except ImportError as e:
+        raise ImportError("A exportação colunar requer o pacote 'pyarrow' (pip install pyarrow).") from e
+    return pyarrow, pyarrow.parquet
+
+
+def separar_alunos(alunos):
+    """
+    Separa a string de alunos exibida pelo SIGAA em quantidade de matriculados e capacidade.
+
+    Exemplo de uso:
+        separar_alunos("56/55 alunos")
+        # retorno será: (56, 55)
+
+    Retorno:
+        tuple: (matriculados, capacidade) como inteiros, ou (None, None) se a string não seguir o formato.
+    """
+    correspondencia = re.search(r'(\d+)\s*/\s*(\d+)', alunos or '')
+    if correspondencia is None:
+        return None, None
+    return int(correspondencia.group(1)), int(correspondencia.group(2))
+
+
+def converter_carga_horaria(cargaHoraria):
+    """
+    Converte a carga horária no formato do SIGAA (ex.: "60h") para um inteiro em horas.
+
+    Retorno:
+        int or None: A carga horária em horas, ou None se não estiver presente.
+    """
+    correspondencia = re.search(r'\d+', cargaHoraria or '')
+    return int(correspondencia.group(0)) if correspondencia else None
+
+
+def turma_do_csv(linha):
+    """
+    Converte uma linha de um dump CSV no formato de `data/dados_tabela.csv` para o formato de turma
+    retornado por `extrair_dados_tabela`.
+    """
+    professores, cargaHoraria = obterProfessoresCargaHoraria(linha.get('Docente', ''))
+    turma = linha.get('Turma', '').strip().split(' ')
+    return {
+        'id': None,
+        'nome_da_disciplina': linha.get('Disciplina', '').strip(),
+        'codigo_da_disciplina': None,
+        'semestre': linha.get('Semestre', '').strip(),
+        'codigo_da_turma': turma[1] if len(turma) > 1 else turma[0],
+        'professores': professores,
+        'cargaHoraria': cargaHoraria,
+        'horario': linha.get('Código e Horário', '').strip(),
+        'alunos': linha.get('Alunos', '').strip()
+    }
+
+
+def extrair_registros(objeto, tipo):
+    """
+    Percorre um objeto JSON (saída dos scripts, registro de checkpoint ou lista) e gera os registros do tipo pedido.
+
+    Parâmetros:
+        objeto (dict or list): Objeto JSON lido da entrada.
+        tipo (str): 'turmas' ou 'demandas'.
+    """
+    if isinstance(objeto, list):
+        for item in objeto:
+            yield from extrair_registros(item, tipo)
+        return
+
+    if not isinstance(objeto, dict):
+        return
+
+    if isinstance(objeto.get('resultado'), dict):
+        yield from extrair_registros(objeto['resultado'], tipo)
+        return
+
+    if tipo == 'turmas':
+        if 'turmasEletivas' in objeto:
+            yield from objeto['turmasEletivas']
+        elif 'disciplinas' in objeto:
+            yield from expandir_compacto(objeto)
+        elif 'codigo_da_turma' in objeto:
+            yield objeto
+    elif 'demandas' in objeto:
+        yield from extrair_registros(objeto['demandas'], tipo)
+    elif 'alunosAptos' in objeto:
+        yield objeto
+
+
+def ler_registros(caminho, tipo):
+    """
+    Lê os registros de entrada de forma incremental, sem carregar arquivos CSV ou JSON Lines inteiros na memória.
+
+    Parâmetros:
+        caminho (str): Arquivo de entrada. Pode ser um CSV no formato de `data/dados_tabela.csv` (apenas turmas),
+            um arquivo JSON Lines (ex.: checkpoint de coleta) ou um arquivo JSON com a saída dos scripts.
+        tipo (str): 'turmas' ou 'demandas'.
+    """
+    with open(caminho, 'r', encoding='utf-8', newline='') as arquivo:
+        if caminho.endswith('.csv'):
+            for linha in csv.DictReader(arquivo):
+                yield turma_do_csv(linha)
+        elif caminho.endswith('.jsonl'):
+            for linha in arquivo:
+                linha = linha.strip()
+                if linha:
+                    yield from extrair_registros(json.loads(linha), tipo)
+        else:
+            yield from extrair_registros(json.load(arquivo), tipo)
+
+
+class DicionarioColuna:
+    """
+    Dicionário de valores de uma coluna codificada por dicionário.
+
+    O dicionário é compartilhado entre todos os lotes e apenas cresce, de modo que cada lote
+    pode ser gravado como um delta do anterior.
+    """
+
+    def __init__(self):
+        self.indices = {}
+        self.valores = []
+
+    def codificar(self, valor):
+        if valor is None:
+            return None
+        indice = self.indices.get(valor)
+        if indice is None:
+            indice = len(self.valores)
+            self.indices[valor] = indice
+            self.valores.append(valor)
+        return indice
+
+    def array(self, pa, indices):
+        return pa.DictionaryArray.from_arrays(
+            pa.array(indices, type=pa.int32()),
+            pa.array(self.valores, type=pa.string())
+        )
+
+
+def esquema_turmas(pa):
+    dicionario = pa.dictionary(pa.int32(), pa.string())
+    return pa.schema([
+        ('codigo_da_disciplina', dicionario),
+        ('nome_da_disciplina', dicionario),
+        ('semestre', dicionario),
+        ('codigo_da_turma', pa.string()),
+        ('docentes', pa.list_(dicionario)),
+        ('carga_horaria', pa.int16()),
+        ('horario', pa.string()),
+        ('matriculados', pa.int32()),
+        ('capacidade', pa.int32())
+    ])
+
+
+def esquema_demandas(pa):
+    dicionario = pa.dictionary(pa.int32(), pa.string())
+    return pa.schema([
+        ('componente_curricular', dicionario),
+        ('ano_periodo_ingresso', dicionario),
+        ('alunos_aptos', pa.int32())
+    ])
+
+
+def lotes_turmas(pa, registros, tamanhoLote):
+    """
+    Converte os registros de turmas em record batches tipados de até `tamanhoLote` linhas.
+    """
+    esquema = esquema_turmas(pa)
+    dicionarios = {nome: DicionarioColuna() for nome in ('codigo_da_disciplina', 'nome_da_disciplina', 'semestre', 'docentes')}
+
+    def montar(colunas):
+        docentes = pa.ListArray.from_arrays(
+            pa.array(colunas['offsets_docentes'], type=pa.int32()),
+            dicionarios['docentes'].array(pa, colunas['docentes'])
+        )
+        return pa.RecordBatch.from_arrays([
+            dicionarios['codigo_da_disciplina'].array(pa, colunas['codigo_da_disciplina']),
+            dicionarios['nome_da_disciplina'].array(pa, colunas['nome_da_disciplina']),
+            dicionarios['semestre'].array(pa, colunas['semestre']),
+            pa.array(colunas['codigo_da_turma'], type=pa.string()),
+            docentes,
+            pa.array(colunas['carga_horaria'], type=pa.int16()),
+            pa.array(colunas['horario'], type=pa.string()),
+            pa.array(colunas['matriculados'], type=pa.int32()),
+            pa.array(colunas['capacidade'], type=pa.int32())
+        ], schema=esquema)
+
+    def colunas_vazias():
+        colunas = {nome: [] for nome in esquema.names}
+        colunas['offsets_docentes'] = [0]
+        return colunas
+
+    colunas = colunas_vazias()
+    linhas = 0
+    for turma in registros:
+        matriculados, capacidade = separar_alunos(turma.get('alunos'))
+        colunas['codigo_da_disciplina'].append(dicionarios['codigo_da_disciplina'].codificar(turma.get('codigo_da_disciplina')))
+        colunas['nome_da_disciplina'].append(dicionarios['nome_da_disciplina'].codificar(turma.get('nome_da_disciplina')))
+        colunas['semestre'].append(dicionarios['semestre'].codificar(turma.get('semestre')))
+        colunas['codigo_da_turma'].append(turma.get('codigo_da_turma'))
+        for professor in turma.get('professores') or []:
+            colunas['docentes'].append(dicionarios['docentes'].codificar(professor.get('nome')))
+        colunas['offsets_docentes'].append(len(colunas['docentes']))
+        colunas['carga_horaria'].append(converter_carga_horaria(turma.get('cargaHoraria')))
+        colunas['horario'].append(turma.get('horario'))
+        colunas['matriculados'].append(matriculados)
+        colunas['capacidade'].append(capacidade)
+        linhas += 1
+
+        if linhas == tamanhoLote:
+            yield montar(colunas)
+            colunas = colunas_vazias()
+            linhas = 0
+
+    if linhas:
+        yield montar(colunas)
+
+
+def lotes_demandas(pa, registros, tamanhoLote):
+    """
+    Converte os registros de demandas em record batches tipados de até `tamanhoLote` linhas.
+    """
+    esquema = esquema_demandas(pa)
+    componentes = DicionarioColuna()
+    periodos = DicionarioColuna()
+
+    def montar(colunas):
+        return pa.RecordBatch.from_arrays([
+            componentes.array(pa, colunas['componente_curricular']),
+            periodos.array(pa, colunas['ano_periodo_ingresso']),
+            pa.array(colunas['alunos_aptos'], type=pa.int32())
+        ], schema=esquema)
+
+    colunas = {nome: [] for nome in esquema.names}
+    for demanda in registros:
+        colunas['componente_curricular'].append(componentes.codificar(demanda.get('componenteCurricular')))
+        colunas['ano_periodo_ingresso'].append(periodos.codificar(demanda.get('anoPeriodoIngresso')))
+        colunas['alunos_aptos'].append(demanda.get('alunosAptos'))
+
+        if len(colunas['alunos_aptos']) == tamanhoLote:
+            yield montar(colunas)
+            colunas = {nome: [] for nome in esquema.names}
+
+    if colunas['alunos_aptos']:
+        yield montar(colunas)
+
+
+def exportar(params):
+    """
+    Exporta turmas ou demandas coletadas para um arquivo colunar tipado (Parquet ou Arrow IPC).
+
+    A entrada é lida de forma incremental e gravada em row groups (Parquet) ou record batches (Arrow IPC)
+    de tamanho fixo, de modo que coletas grandes não precisam ficar inteiras na memória. As colunas de
+    texto repetitivas (disciplina, docente, semestre, componente) são codificadas por dicionário, e as
+    strings do SIGAA são convertidas em campos numéricos:
+        - "56/55 alunos" -> matriculados = 56, capacidade = 55
+        - "60h" -> carga_horaria = 60
+
+    Parâmetros:
+        params (dict): Dicionário contendo os parâmetros da exportação, com possíveis chaves:
+            - 'tipo' (str): 'turmas' (padrão) ou 'demandas'.
+            - 'entrada' (str): Arquivo de entrada (CSV, JSON Lines ou JSON, ver `ler_registros`).
+            - 'saida' (str): Arquivo de saída.
+            - 'formato' (str): 'parquet' ou 'arrow'. Se omitido, é deduzido da extensão da saída.
+            - 'tamanhoLote' (int): Linhas por row group/record batch, maior que zero (padrão: 10000).
+
+    Retorno:
+        dict: Um dicionário com a quantidade de linhas exportadas e os logs da operação, e o status HTTP
+        (200 em caso de sucesso, 400 para parâmetros inválidos e 500 para erro inesperado).
+    """
+    logs = []
+
+    tipo = params.get('tipo', 'turmas')
+    entrada = params.get('entrada', '')
+    saida = params.get('saida', '')
+    formato = params.get('formato') or ('arrow' if saida.endswith(('.arrow', '.feather', '.ipc')) else 'parquet')
+    tamanhoLote = params.get('tamanhoLote', TAMANHO_LOTE)
+
+    if tipo not in ('turmas', 'demandas') or formato not in ('parquet', 'arrow') or not entrada or not saida:
+        return {
+            'resultado': "Parâmetros inválidos: informe 'entrada', 'saida', 'tipo' ('turmas' ou 'demandas') e 'formato' ('parquet' ou 'arrow').",
+            'status': 400
+        }
+
+    # Com um lote menor que 1, o limite de linhas nunca é atingido e toda a entrada vira um único lote
+    try:
+        if isinstance(tamanhoLote, bool) or int(tamanhoLote) != float(tamanhoLote) or int(tamanhoLote) <= 0:
+            raise ValueError
+        tamanhoLote = int(tamanhoLote)
+    except (TypeError, ValueError):
+        return {
+            'resultado': "Parâmetros inválidos: 'tamanhoLote' deve ser um número inteiro maior que zero.",
+            'status': 400
+        }
+
+    try:
+        pa, pq = importar_pyarrow()
+        registros = ler_registros(entrada, tipo)
+        if tipo == 'turmas':
+            esquema = esquema_turmas(pa)
+            lotes = lotes_turmas(pa, registros, tamanhoLote)
+        else:
+            esquema = esquema_demandas(pa)
+            lotes = lotes_demandas(pa, registros, tamanhoLote)
+
+        linhas = 0
+        if formato == 'parquet':
+            with pq.ParquetWriter(saida, esquema) as escritor:
+                for lote in lotes:
+                    escritor.write_batch(lote)
+                    linhas += lote.num_rows
+        else:
+            opcoes = pa.ipc.IpcWriteOptions(emit_dictionary_deltas=True)
+            with pa.OSFile(saida, 'wb') as arquivo, pa.ipc.new_file(arquivo, esquema, options=opcoes) as escritor:
+                for lote in lotes:
+                    escritor.write_batch(lote)
+                    linhas += lote.num_rows
+
+        logs.append(f"{linhas} linha(s) de {tipo} exportada(s) para '{saida}' no formato {formato}.")
+        return {
+            'resultado': {
+                'logs': logs,
+                'linhas': linhas,
+                'saida': saida
+            },
+            'status': 200
+        }
+
+    except Exception as e:
+        logs.append(f"Ocorreu um erro: {str(e)}")
+        return {
+            'resultado': str(e),
+            'status': 500
+        }
+
+
+def ler_exportacao(caminho):
+    """
+    Lê um arquivo exportado por `exportar` como uma tabela Arrow, mapeando o arquivo em memória.
+
+    Arquivos Arrow IPC são lidos sem cópia (zero-copy) a partir do mapeamento em memória.
+
+    Parâmetros:
+        caminho (str): Arquivo Parquet ou Arrow IPC.
+
+    Retorno:
+        pyarrow.Table: A tabela lida.
+    """
+    pa, pq = importar_pyarrow()
+    if caminho.endswith(('.arrow', '.feather', '.ipc')):
+        return pa.ipc.open_file(pa.memory_map(caminho, 'r')).read_all()
+    return pq.read_table(caminho, memory_map=True)
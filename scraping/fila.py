@@ -0,0 +1,462 @@
+import os
+import sys
+import json
+import time
+import socket
+import sqlite3
+import threading
+import multiprocessing
+from contextlib import closing
+from .core import exigir_sessao
+from .perfilamento import validar_perfilamento
+
+
+# Tipos de tarefa aceitos pela fila
+TIPOS_TAREFA = ('turmas', 'demandas')
+
+# Tempo padrão, em segundos, durante o qual uma tarefa arrendada fica invisível para os demais trabalhadores
+VISIBILIDADE_PADRAO = 600
+
+# Quantidade padrão de tentativas antes de uma tarefa ser marcada como falha
+MAX_TENTATIVAS_PADRAO = 3
+
+
+class FilaSQLite:
+    """
+    Fila de tarefas durável em um arquivo SQLite local.
+
+    Pode ser compartilhada por vários processos do mesmo host. Cada operação abre a sua própria conexão,
+    de modo que a fila também pode ser usada por várias threads. Para distribuir tarefas entre hosts,
+    use `FilaRedis`.
+    """
+
+    def __init__(self, caminho):
+        self.caminho = caminho
+        diretorio = os.path.dirname(caminho)
+        if diretorio:
+            os.makedirs(diretorio, exist_ok=True)
+        with closing(self.conectar()) as conexao:
+            conexao.execute('PRAGMA journal_mode=WAL')
+            conexao.execute("""
+                CREATE TABLE IF NOT EXISTS tarefas (
+                    id INTEGER PRIMARY KEY AUTOINCREMENT,
+                    tipo TEXT NOT NULL,
+                    params TEXT NOT NULL,
+                    estado TEXT NOT NULL DEFAULT 'pendente',
+                    tentativas INTEGER NOT NULL DEFAULT 0,
+                    trabalhador TEXT,
+                    arrendadaAte REAL,
+                    resultado TEXT
+                )
+            """)
+            conexao.execute('CREATE INDEX IF NOT EXISTS tarefas_estado ON tarefas (estado, arrendadaAte)')
+
+    def conectar(self):
+        conexao = sqlite3.connect(self.caminho, timeout=30, isolation_level=None)
+        conexao.row_factory = sqlite3.Row
+        return conexao
+
+    def enfileirar(self, tipo, params):
+        with closing(self.conectar()) as conexao:
+            cursor = conexao.execute('INSERT INTO tarefas (tipo, params) VALUES (?, ?)', (tipo, json.dumps(params)))
+            return cursor.lastrowid
+
+    def arrendar(self, trabalhador, visibilidade, maxTentativas):
+        """
+        Arrenda a próxima tarefa pendente, ou cuja visibilidade expirou porque o trabalhador anterior caiu.
+
+        Retorno:
+            tuple or None: (id, tipo, params) da tarefa arrendada, ou None se não houver tarefas disponíveis.
+        """
+        agora = time.time()
+        conexao = self.conectar()
+        try:
+            conexao.execute('BEGIN IMMEDIATE')
+            # Tarefas abandonadas que já esgotaram as tentativas são marcadas como falha
+            conexao.execute(
+                "UPDATE tarefas SET estado = 'falha' WHERE estado = 'executando' AND arrendadaAte < ? AND tentativas >= ?",
+                (agora, maxTentativas)
+            )
+            linha = conexao.execute(
+                "SELECT id, tipo, params FROM tarefas "
+                "WHERE estado = 'pendente' OR (estado = 'executando' AND arrendadaAte < ?) "
+                "ORDER BY id LIMIT 1",
+                (agora,)
+            ).fetchone()
+            if linha is None:
+                conexao.execute('COMMIT')
+                return None
+            conexao.execute(
+                "UPDATE tarefas SET estado = 'executando', trabalhador = ?, arrendadaAte = ?, tentativas = tentativas + 1 WHERE id = ?",
+                (trabalhador, agora + visibilidade, linha['id'])
+            )
+            conexao.execute('COMMIT')
+            return linha['id'], linha['tipo'], json.loads(linha['params'])
+        except Exception:
+            conexao.execute('ROLLBACK')
+            raise
+        finally:
+            conexao.close()
+
+    def renovar(self, identificador, trabalhador, visibilidade):
+        with closing(self.conectar()) as conexao:
+            conexao.execute(
+                "UPDATE tarefas SET arrendadaAte = ? WHERE id = ? AND trabalhador = ? AND estado = 'executando'",
+                (time.time() + visibilidade, identificador, trabalhador)
+            )
+
+    def concluir(self, identificador, trabalhador, resultado, maxTentativas):
+        """
+        Grava o resultado de uma tarefa. Tarefas com status diferente de 200 voltam para a fila até esgotarem as tentativas.
+
+        O resultado só é aceito do trabalhador que detém o arrendamento, para que um trabalhador cuja
+        visibilidade expirou não sobrescreva a execução de outro.
+        """
+        with closing(self.conectar()) as conexao:
+            conexao.execute(
+                "UPDATE tarefas SET "
+                "estado = CASE WHEN ? = 200 THEN 'concluida' WHEN tentativas >= ? THEN 'falha' ELSE 'pendente' END, "
+                "resultado = ?, arrendadaAte = NULL "
+                "WHERE id = ? AND trabalhador = ? AND estado = 'executando'",
+                (resultado.get('status'), maxTentativas, json.dumps(resultado), identificador, trabalhador)
+            )
+
+    def resultados(self):
+        with closing(self.conectar()) as conexao:
+            return [
+                {
+                    'id': linha['id'],
+                    'tipo': linha['tipo'],
+                    'params': json.loads(linha['params']),
+                    'estado': linha['estado'],
+                    'tentativas': linha['tentativas'],
+                    'resultado': json.loads(linha['resultado']) if linha['resultado'] else None
+                }
+                for linha in conexao.execute('SELECT * FROM tarefas ORDER BY id')
+            ]
+
+    def resumo(self):
+        with closing(self.conectar()) as conexao:
+            return {linha['estado']: linha['quantidade'] for linha in conexao.execute(
+                'SELECT estado, COUNT(*) AS quantidade FROM tarefas GROUP BY estado'
+            )}
+
+
+# Move atomicamente a próxima tarefa pendente para o conjunto de tarefas em execução
+ARRENDAR_LUA = """
+local identificador = redis.call('RPOP', KEYS[1])
+if not identificador then
+    return nil
+end
+redis.call('ZADD', KEYS[2], ARGV[1], identificador)
+local chave = KEYS[3] .. identificador
+redis.call('HSET', chave, 'estado', 'executando', 'trabalhador', ARGV[2])
+redis.call('HINCRBY', chave, 'tentativas', 1)
+return identificador
+"""
+
+
+class FilaRedis:
+    """
+    Fila de tarefas em um servidor Redis, para distribuir tarefas entre trabalhadores de vários hosts.
+
+    As tarefas pendentes ficam em uma lista, e as tarefas em execução em um conjunto ordenado pelo fim
+    do arrendamento, de onde as tarefas de trabalhadores que caíram são devolvidas à lista.
+    Requer o pacote opcional 'redis'.
+    """
+
+    def __init__(self, url, prefixo='sigaa:fila'):
+        try:
+            import redis
+        except ImportError as e:
+            raise ImportError("A fila no Redis requer o pacote 'redis' (pip install redis).") from e
+        self.cliente = redis.Redis.from_url(url, decode_responses=True)
+        self.prefixo = prefixo
+        self.pendentes = f'{prefixo}:pendentes'
+        self.executando = f'{prefixo}:executando'
+        self.tarefa = f'{prefixo}:tarefa:'
+        self.script_arrendar = self.cliente.register_script(ARRENDAR_LUA)
+
+    def enfileirar(self, tipo, params):
+        identificador = self.cliente.incr(f'{self.prefixo}:ultimoId')
+        self.cliente.hset(self.tarefa + str(identificador), mapping={
+            'tipo': tipo,
+            'params': json.dumps(params),
+            'estado': 'pendente',
+            'tentativas': 0
+        })
+        self.cliente.lpush(self.pendentes, identificador)
+        return identificador
+
+    def devolver_expiradas(self, maxTentativas):
+        for identificador in self.cliente.zrangebyscore(self.executando, '-inf', time.time()):
+            # Só quem remove a tarefa do conjunto a devolve, evitando duplicá-la na lista
+            if self.cliente.zrem(self.executando, identificador):
+                chave = self.tarefa + identificador
+                if int(self.cliente.hget(chave, 'tentativas') or 0) >= maxTentativas:
+                    self.cliente.hset(chave, 'estado', 'falha')
+                else:
+                    self.cliente.hset(chave, 'estado', 'pendente')
+                    self.cliente.rpush(self.pendentes, identificador)
+
+    def arrendar(self, trabalhador, visibilidade, maxTentativas):
+        self.devolver_expiradas(maxTentativas)
+        identificador = self.script_arrendar(
+            keys=[self.pendentes, self.executando, self.tarefa],
+            args=[time.time() + visibilidade, trabalhador]
+        )
+        if identificador is None:
+            return None
+        tarefa = self.cliente.hgetall(self.tarefa + identificador)
+        return int(identificador), tarefa['tipo'], json.loads(tarefa['params'])
+
+    def renovar(self, identificador, trabalhador, visibilidade):
+        if self.cliente.hget(self.tarefa + str(identificador), 'trabalhador') == trabalhador:
+            self.cliente.zadd(self.executando, {str(identificador): time.time() + visibilidade}, xx=True)
+
+    def concluir(self, identificador, trabalhador, resultado, maxTentativas):
+        chave = self.tarefa + str(identificador)
+        if self.cliente.hget(chave, 'trabalhador') != trabalhador or not self.cliente.zrem(self.executando, str(identificador)):
+            return
+        if resultado.get('status') == 200:
+            estado = 'concluida'
+        elif int(self.cliente.hget(chave, 'tentativas') or 0) >= maxTentativas:
+            estado = 'falha'
+        else:
+            estado = 'pendente'
+        self.cliente.hset(chave, mapping={'estado': estado, 'resultado': json.dumps(resultado)})
+        if estado == 'pendente':
+            self.cliente.rpush(self.pendentes, identificador)
+
+    def resultados(self):
+        ultimo = int(self.cliente.get(f'{self.prefixo}:ultimoId') or 0)
+        resultados = []
+        for identificador in range(1, ultimo + 1):
+            tarefa = self.cliente.hgetall(self.tarefa + str(identificador))
+            if tarefa:
+                resultados.append({
+                    'id': identificador,
+                    'tipo': tarefa['tipo'],
+                    'params': json.loads(tarefa['params']),
+                    'estado': tarefa['estado'],
+                    'tentativas': int(tarefa.get('tentativas', 0)),
+                    'resultado': json.loads(tarefa['resultado']) if tarefa.get('resultado') else None
+                })
+        return resultados
+
+    def resumo(self):
+        resumo = {}
+        for tarefa in self.resultados():
+            resumo[tarefa['estado']] = resumo.get(tarefa['estado'], 0) + 1
+        return resumo
+
+
+def validar_tarefa(tipo, params):
+    """
+    Valida uma tarefa de 'turmas' ou 'demandas' como os subcomandos correspondentes, incluindo a sessão e o perfilamento.
+
+    Chamada ao enfileirar, para que tarefas inválidas sejam rejeitadas antes de ocupar um trabalhador.
+    """
+    if tipo == 'turmas':
+        from .webscraping import validar_turmas as validar
+    else:
+        from .webscrapingDemandas import validar_demandas as validar
+    return validar(params) or exigir_sessao(params) or validar_perfilamento(params)
+
+
+def abrir_fila(endereco):
+    """
+    Abre a fila indicada pelo endereço: uma URL 'redis://...' usa `FilaRedis`, qualquer outro valor é o caminho de um arquivo SQLite.
+    """
+    if endereco.startswith(('redis://', 'rediss://')):
+        return FilaRedis(endereco)
+    return FilaSQLite(endereco)
+
+
+def funcao_da_tarefa(tipo, params):
+    """
+    Escolhe a função `main` que executa uma tarefa, conforme o tipo e os parâmetros.
+    """
+    if tipo == 'turmas':
+        from . import webscraping
+        return webscraping.executar_consultas if 'consultas' in params else webscraping.main
+
+    from . import webscrapingDemandas
+    return webscrapingDemandas.executar_componentes if 'componentesCurriculares' in params else webscrapingDemandas.main
+
+
+def renovar_periodicamente(fila, identificador, trabalhador, visibilidade, parar):
+    """
+    Renova o arrendamento de uma tarefa em execução até que `parar` seja sinalizado.
+    """
+    while not parar.wait(visibilidade / 3):
+        try:
+            fila.renovar(identificador, trabalhador, visibilidade)
+        except Exception as e:
+            # Sem a renovação, o arrendamento pode expirar e o resultado desta execução ser descartado por `concluir`
+            print(f"Erro ao renovar o arrendamento da tarefa {identificador} ({trabalhador}): {e}", file=sys.stderr, flush=True)
+
+
+def trabalhar(endereco, opcoes):
+    """
+    Laço de um trabalhador: arrenda tarefas, executa-as com as funções `main` existentes e grava os resultados.
+
+    O Playwright é iniciado uma única vez por trabalhador e reaproveitado entre as tarefas. Enquanto uma
+    tarefa executa, o arrendamento é renovado em segundo plano; se o trabalhador cair, a tarefa volta a
+    ficar visível ao fim do arrendamento e é executada por outro trabalhador.
+
+    Parâmetros:
+        endereco (str): Endereço da fila (ver `abrir_fila`).
+        opcoes (dict): Opções do trabalhador:
+            - 'visibilidade' (float): Duração do arrendamento, em segundos (padrão: 600).
+            - 'maxTentativas' (int): Tentativas antes de marcar a tarefa como falha (padrão: 3).
+            - 'aguardar' (bool): Se verdadeiro, aguarda novas tarefas em vez de encerrar quando a fila esvaziar.
+            - 'intervaloEspera' (float): Intervalo entre verificações da fila vazia, em segundos (padrão: 5).
+
+    Retorno:
+        int: Quantidade de tarefas executadas pelo trabalhador.
+    """
+    from playwright.sync_api import sync_playwright
+    from .core import caminho_har
+    from .perfilamento import executar_com_perfil
+
+    fila = abrir_fila(endereco)
+    trabalhador = f"{socket.gethostname()}-{os.getpid()}"
+    visibilidade = float(opcoes.get('visibilidade', VISIBILIDADE_PADRAO))
+    maxTentativas = int(opcoes.get('maxTentativas', MAX_TENTATIVAS_PADRAO))
+    executadas = 0
+
+    with sync_playwright() as playwright:
+        while True:
+            tarefa = fila.arrendar(trabalhador, visibilidade, maxTentativas)
+            if tarefa is None:
+                if not opcoes.get('aguardar'):
+                    break
+                time.sleep(float(opcoes.get('intervaloEspera', 5)))
+                continue
+
+            identificador, tipo, params = tarefa
+            parar = threading.Event()
+            renovacao = threading.Thread(
+                target=renovar_periodicamente,
+                args=(fila, identificador, trabalhador, visibilidade, parar),
+                daemon=True
+            )
+            renovacao.start()
+            if params.get('gravarHar'):
+                # Tarefas com o mesmo 'gravarHar' não sobrescrevem o HAR umas das outras
+                params = {**params, 'gravarHar': caminho_har(params['gravarHar'], f"tarefa-{identificador}")}
+            try:
+                resultado = executar_com_perfil(funcao_da_tarefa(tipo, params), playwright, params)
+            except Exception as e:
+                resultado = {'resultado': str(e), 'status': 500}
+            finally:
+                parar.set()
+                renovacao.join()
+
+            if isinstance(resultado.get('resultado'), dict) and resultado['resultado'].get('extracaoConcluida') is False:
+                # Erro nos filtros ou extração interrompida (ver `webscraping.main`): a tarefa volta para a fila
+                resultado = {**resultado, 'status': 500}
+
+            fila.concluir(identificador, trabalhador, resultado, maxTentativas)
+            executadas += 1
+
+    return executadas
+
+
+def main(params):
+    """
+    Modo de fila de trabalho: distribui tarefas de consulta de turmas e de demandas entre processos e hosts.
+
+    Parâmetros:
+        params (dict): Dicionário contendo os parâmetros para a execução, com possíveis chaves:
+            - 'acao' (str): 'enfileirar', 'trabalhar', 'resultados' ou 'resumo'.
+            - 'fila' (str): Caminho do arquivo SQLite (padrão: 'data/fila.sqlite') ou URL 'redis://...'.
+            - 'tarefas' (list): Para 'enfileirar', lista de objetos {"tipo": "turmas" ou "demandas", "params": {...}},
+              em que 'params' são os mesmos parâmetros dos subcomandos correspondentes.
+            - 'trabalhadores' (int): Para 'trabalhar', quantidade de processos trabalhadores neste host (padrão: 1).
+            - Demais opções de `trabalhar` ('visibilidade', 'maxTentativas', 'aguardar', 'intervaloEspera').
+
+    Retorno:
+        dict: Um dicionário com o resultado da ação e os logs da operação, e o status HTTP
+        (200 em caso de sucesso, 400 para parâmetros inválidos, inclusive de uma tarefa a enfileirar, e 500
+        para erro inesperado ou se algum processo trabalhador terminar com código de saída diferente de zero).
+
+    Exemplo de uso:
+        main({'acao': 'enfileirar', 'tarefas': [{'tipo': 'turmas', 'params': {'userData': 'cookie_value', 'departamento': '...'}}]})
+        main({'acao': 'trabalhar', 'trabalhadores': 4})
+        main({'acao': 'resultados'})
+    """
+    logs = []
+    status = 200
+    acao = params.get('acao', '')
+    endereco = params.get('fila', 'data/fila.sqlite')
+
+    if acao not in ('enfileirar', 'trabalhar', 'resultados', 'resumo'):
+        return {
+            'resultado': "Parâmetros inválidos: 'acao' deve ser 'enfileirar', 'trabalhar', 'resultados' ou 'resumo'.",
+            'status': 400
+        }
+
+    tarefas = params.get('tarefas', [])
+    if acao == 'enfileirar' and (
+        not isinstance(tarefas, list)
+        or not all(isinstance(tarefa, dict) and tarefa.get('tipo') in TIPOS_TAREFA and isinstance(tarefa.get('params', {}), dict) for tarefa in tarefas)
+    ):
+        return {
+            'resultado': "Parâmetros inválidos: 'tarefas' deve ser uma lista de objetos com 'tipo' ('turmas' ou 'demandas') e 'params'.",
+            'status': 400
+        }
+    if acao == 'enfileirar':
+        # As tarefas passam pela mesma validação dos subcomandos, para não ocuparem trabalhadores sem chance de sucesso
+        for indice, tarefa in enumerate(tarefas):
+            erro = validar_tarefa(tarefa['tipo'], tarefa.get('params', {}))
+            if erro:
+                return {
+                    'resultado': f"Tarefa {indice}: {erro['resultado']}",
+                    'status': erro['status']
+                }
+
+    try:
+        fila = abrir_fila(endereco)
+
+        if acao == 'enfileirar':
+            identificadores = [fila.enfileirar(tarefa['tipo'], tarefa.get('params', {})) for tarefa in tarefas]
+            logs.append(f"{len(identificadores)} tarefa(s) enfileirada(s) em '{endereco}'.")
+            resultado = {'logs': logs, 'tarefas': identificadores}
+
+        elif acao == 'trabalhar':
+            quantidade = int(params.get('trabalhadores', 1))
+            if quantidade <= 1:
+                executadas = trabalhar(endereco, params)
+                logs.append(f"{executadas} tarefa(s) executada(s).")
+            else:
+                processos = [multiprocessing.Process(target=trabalhar, args=(endereco, params)) for _ in range(quantidade)]
+                for processo in processos:
+                    processo.start()
+                for processo in processos:
+                    processo.join()
+                falhas = [processo.exitcode for processo in processos if processo.exitcode != 0]
+                logs.append(f"{quantidade} trabalhadores encerrados.")
+                if falhas:
+                    logs.append(f"{len(falhas)} trabalhador(es) encerrado(s) com erro (códigos de saída: {falhas}).")
+                    status = 500
+            resultado = {'logs': logs, 'resumo': fila.resumo()}
+
+        elif acao == 'resultados':
+            resultado = {'logs': logs, 'tarefas': fila.resultados()}
+
+        else:
+            resultado = {'logs': logs, 'resumo': fila.resumo()}
+
+        return {
+            'resultado': resultado,
+            'status': status
+        }
+
+    except Exception as e:
+        logs.append(f"Ocorreu um erro: {str(e)}")
+        return {
+            'resultado': str(e),
+            'status': 500
+        }
@@ -0,0 +1,134 @@
+import json
+from itertools import combinations
+
+
+class IndiceAlunosAptos:
+    """
+    Índice, por execução, dos alunos aptos a cursar cada componente curricular.
+
+    Cada matrícula recebe um id inteiro sequencial, e o conjunto de alunos aptos de um componente é
+    guardado como um bitset (um inteiro Python em que o bit `id` indica o aluno). Assim, sobreposições
+    e demandas exclusivas entre vários componentes são calculadas com operações de bits, sem gerar
+    os relatórios novamente.
+
+    Exemplo de uso:
+        indice = IndiceAlunosAptos()
+        indice.adicionar('COMP0415', ['201900012345', '201900054321'])
+        indice.adicionar('COMP0438', ['201900012345'])
+        indice.sobreposicao('COMP0415', 'COMP0438')
+        # retorno será: 1
+    """
+
+    def __init__(self):
+        self.ids = {}
+        self.matriculas = []
+        self.componentes = {}
+
+    def adicionar(self, componente, alunos):
+        """
+        Registra os alunos aptos a cursar um componente curricular.
+
+        Parâmetros:
+            componente (str): Componente curricular.
+            alunos (iterable): Matrículas extraídas do relatório.
+        """
+        bits = self.componentes.get(componente, 0)
+        for matricula in alunos:
+            identificador = self.ids.get(matricula)
+            if identificador is None:
+                identificador = len(self.matriculas)
+                self.ids[matricula] = identificador
+                self.matriculas.append(matricula)
+            bits |= 1 << identificador
+        self.componentes[componente] = bits
+
+    def aptos(self, componente):
+        """
+        Retorna a quantidade de alunos aptos a cursar um componente.
+        """
+        return self.componentes.get(componente, 0).bit_count()
+
+    def sobreposicao(self, *componentes):
+        """
+        Retorna a quantidade de alunos aptos a cursar todos os componentes informados.
+        """
+        bits = -1
+        for componente in componentes:
+            bits &= self.componentes.get(componente, 0)
+        return max(bits, 0).bit_count()
+
+    def exclusivos(self, componente):
+        """
+        Retorna a quantidade de alunos aptos a cursar o componente e nenhum dos demais componentes do índice.
+        """
+        outros = 0
+        for nome, bits in self.componentes.items():
+            if nome != componente:
+                outros |= bits
+        return (self.componentes.get(componente, 0) & ~outros).bit_count()
+
+    def alunos(self, *componentes):
+        """
+        Retorna as matrículas dos alunos aptos a cursar todos os componentes informados.
+        """
+        bits = -1
+        for componente in componentes:
+            bits &= self.componentes.get(componente, 0)
+        bits = max(bits, 0)
+        return [matricula for identificador, matricula in enumerate(self.matriculas) if bits >> identificador & 1]
+
+    def resumo(self):
+        """
+        Calcula os números agregados de demanda entre os componentes do índice.
+
+        Retorno:
+            dict: Um dicionário contendo:
+                - alunosDistintos (int): Alunos aptos a cursar ao menos um componente.
+                - alunosEmVariosComponentes (int): Alunos aptos a cursar mais de um componente.
+                - componentes (dict): Para cada componente, a quantidade de alunos aptos e de alunos exclusivos.
+                - sobreposicoes (list): Para cada par de componentes, a quantidade de alunos aptos a cursar ambos.
+        """
+        uniao = 0
+        repetidos = 0
+        for bits in self.componentes.values():
+            repetidos |= uniao & bits
+            uniao |= bits
+
+        return {
+            'alunosDistintos': uniao.bit_count(),
+            'alunosEmVariosComponentes': repetidos.bit_count(),
+            'componentes': {
+                componente: {
+                    'aptos': self.aptos(componente),
+                    'exclusivos': self.exclusivos(componente)
+                }
+                for componente in self.componentes
+            },
+            'sobreposicoes': [
+                {'componentes': [a, b], 'alunos': self.sobreposicao(a, b)}
+                for a, b in combinations(self.componentes, 2)
+            ]
+        }
+
+    def salvar(self, caminho):
+        """
+        Grava o índice em um arquivo JSON, com os bitsets em hexadecimal. Apenas as matrículas são gravadas, sem os nomes dos alunos.
+        """
+        with open(caminho, 'w', encoding='utf-8') as arquivo:
+            json.dump({
+                'matriculas': self.matriculas,
+                'componentes': {componente: format(bits, 'x') for componente, bits in self.componentes.items()}
+            }, arquivo, ensure_ascii=False)
+
+    @classmethod
+    def carregar(cls, caminho):
+        """
+        Lê um índice gravado por `salvar`.
+        """
+        with open(caminho, 'r', encoding='utf-8') as arquivo:
+            dados = json.load(arquivo)
+        indice = cls()
+        indice.matriculas = dados.get('matriculas', [])
+        indice.ids = {matricula: identificador for identificador, matricula in enumerate(indice.matriculas)}
+        indice.componentes = {componente: int(bits, 16) for componente, bits in dados.get('componentes', {}).items()}
+        return indice
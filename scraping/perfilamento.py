@@ -0,0 +1,235 @@
+import os
+import glob
+import json
+import uuid
+import random
+import pstats
+import zipfile
+import cProfile
+from time import perf_counter
+from datetime import datetime
+
+
+# Quantidade padrão de itens em cada ranking do resumo
+TOP_PADRAO = 20
+
+
+def validar_perfilamento(params):
+    """
+    Valida a chave opcional 'perfilamento' antes de iniciar o Playwright.
+
+    Retorno:
+        dict or None: O retorno de parâmetros inválidos (ver `core.invalido`), ou None se a configuração for válida.
+    """
+    from .core import invalido, validar_numero
+
+    configuracao = params.get('perfilamento')
+    if not configuracao or configuracao is True:
+        return None
+    if not isinstance(configuracao, dict):
+        return invalido("'perfilamento' deve ser um objeto ou true.")
+    if not isinstance(configuracao.get('diretorio', ''), str):
+        return invalido("'perfilamento.diretorio' deve ser um caminho.")
+
+    opcoes = {
+        'perfilamento.amostragem': configuracao.get('amostragem', 1),
+        'perfilamento.top': configuracao.get('top', TOP_PADRAO)
+    }
+    erro = validar_numero(opcoes, 'perfilamento.amostragem', 1, 0) or validar_numero(opcoes, 'perfilamento.top', TOP_PADRAO, 1, inteiro=True)
+    if erro:
+        return erro
+    if float(opcoes['perfilamento.amostragem']) > 1:
+        return invalido("'perfilamento.amostragem' deve estar entre 0 e 1.")
+    return None
+
+
+def executar_com_perfil(funcao, playwright, params):
+    """
+    Executa uma das funções `main` dos scripts, opcionalmente com perfilamento.
+
+    Quando a execução é sorteada para perfilamento, o lado Python é medido com cProfile e o lado do
+    navegador é gravado com o tracing do Playwright (ações, seletores, rede e snapshots). Ao final,
+    um resumo que ranqueia os passos do navegador, as requisições e as funções Python mais custosas
+    é gravado ao lado dos artefatos brutos:
+        - python.prof: estatísticas do cProfile (abrir com `python -m pstats` ou snakeviz).
+        - trace-N.zip: trace do Playwright (abrir com `playwright show-trace`).
+        - resumo.json e resumo.txt: rankings dos passos e funções mais custosos.
+
+    Parâmetros:
+        funcao (callable): Função `main` a ser executada, com assinatura (playwright, params).
+        playwright (object): Instância do Playwright para automação de navegador.
+        params (dict): Parâmetros da execução. A chave opcional 'perfilamento' (dict) ativa o perfilamento:
+            - 'diretorio' (str): Diretório onde os artefatos são gravados (padrão: 'perfis').
+            - 'amostragem' (float): Fração das execuções que são perfiladas, entre 0 e 1 (padrão: 1).
+              A configuração é validada por `validar_perfilamento` antes de o Playwright ser iniciado.
+            - 'top' (int): Quantidade de itens em cada ranking do resumo (padrão: 20).
+
+    Retorno:
+        dict: O retorno de `funcao`. Se a execução foi perfilada, inclui a chave 'perfil' com o diretório dos artefatos.
+    """
+    configuracao = params.get('perfilamento')
+    if not configuracao:
+        return funcao(playwright, params)
+    if not isinstance(configuracao, dict):
+        configuracao = {}
+
+    if random.random() >= float(configuracao.get('amostragem', 1)):
+        return funcao(playwright, params)
+
+    # O sufixo aleatório separa execuções do mesmo processo no mesmo segundo (ex.: tarefas seguidas de um trabalhador da fila)
+    nomeExecucao = f"{datetime.now().strftime('%Y%m%d-%H%M%S')}-{os.getpid()}-{uuid.uuid4().hex[:8]}"
+    diretorio = os.path.join(configuracao.get('diretorio', 'perfis'), nomeExecucao)
+    os.makedirs(diretorio)
+
+    perfil = cProfile.Profile()
+    inicio = perf_counter()
+    perfil.enable()
+    try:
+        resultado = funcao(playwright, {**params, '_diretorioPerfil': diretorio})
+    finally:
+        perfil.disable()
+        duracao = perf_counter() - inicio
+        perfil.dump_stats(os.path.join(diretorio, 'python.prof'))
+        gravar_resumo(diretorio, perfil, duracao, int(configuracao.get('top', TOP_PADRAO)))
+
+    resultado['perfil'] = diretorio
+    return resultado
+
+
+def iniciar_trace(context, params, logs):
+    """
+    Inicia o tracing do Playwright no contexto, se a execução estiver sendo perfilada.
+    """
+    if not params.get('_diretorioPerfil'):
+        return
+    context.tracing.start(screenshots=True, snapshots=True)
+    logs.append("Tracing do Playwright iniciado.")
+
+
+def parar_trace(context, params, logs):
+    """
+    Para o tracing do Playwright e grava o trace no diretório de perfilamento da execução.
+
+    Cada contexto grava um arquivo trace-N.zip próprio, de modo que execuções com várias sub-consultas
+    mantêm um trace por sub-consulta.
+    """
+    diretorio = params.get('_diretorioPerfil')
+    if not diretorio:
+        return
+    caminho = os.path.join(diretorio, f"trace-{len(glob.glob(os.path.join(diretorio, 'trace-*.zip')))}.zip")
+    context.tracing.stop(path=caminho)
+    logs.append(f"Trace do Playwright gravado em '{caminho}'.")
+
+
+def ler_eventos_trace(caminho):
+    """
+    Lê os eventos de ações e de rede de um trace do Playwright.
+
+    Retorno:
+        tuple: (acoes, requisicoes), em que acoes é uma lista de (passo, duracao_ms) e requisicoes
+        é uma lista de (url, duracao_ms).
+    """
+    inicios = {}
+    acoes = []
+    requisicoes = []
+
+    with zipfile.ZipFile(caminho) as arquivo:
+        for nome in arquivo.namelist():
+            if not nome.endswith(('.trace', '.network')):
+                continue
+            for linha in arquivo.read(nome).decode('utf-8').splitlines():
+                try:
+                    evento = json.loads(linha)
+                except json.JSONDecodeError:
+                    continue
+
+                tipo = evento.get('type')
+                if tipo == 'before':
+                    inicios[evento.get('callId')] = evento
+                elif tipo == 'after' and evento.get('callId') in inicios:
+                    antes = inicios.pop(evento['callId'])
+                    acoes.append((descrever_passo(antes), evento.get('endTime', 0) - antes.get('startTime', 0)))
+                elif tipo == 'action':
+                    # Formato de trace das versões antigas do Playwright
+                    metadados = evento.get('metadata', {})
+                    acoes.append((descrever_passo(metadados), metadados.get('endTime', 0) - metadados.get('startTime', 0)))
+                elif tipo == 'resource-snapshot':
+                    snapshot = evento.get('snapshot', {})
+                    requisicoes.append((snapshot.get('request', {}).get('url', ''), snapshot.get('time', 0)))
+
+    return acoes, requisicoes
+
+
+def descrever_passo(evento):
+    """
+    Monta a descrição de um passo do navegador a partir do evento do trace (ex.: "locator.click td.ThemeOfficeMenuItemText").
+    """
+    passo = evento.get('apiName') or f"{evento.get('class', '')}.{evento.get('method', '')}"
+    parametros = evento.get('params', {})
+    alvo = parametros.get('selector') or parametros.get('url')
+    return f"{passo} {alvo}" if alvo else passo
+
+
+def ranquear(itens, top):
+    """
+    Agrupa pares (nome, duracao_ms) pelo nome e os ordena pela duração total, da maior para a menor.
+    """
+    agrupado = {}
+    for nome, duracao in itens:
+        total, chamadas = agrupado.get(nome, (0, 0))
+        agrupado[nome] = (total + duracao, chamadas + 1)
+    ordenado = sorted(agrupado.items(), key=lambda item: item[1][0], reverse=True)[:top]
+    return [{'nome': nome, 'totalMs': round(total, 1), 'chamadas': chamadas} for nome, (total, chamadas) in ordenado]
+
+
+def ranquear_funcoes(perfil, top):
+    """
+    Ordena as funções Python pelo tempo gasto na própria função (tottime), da maior para a menor.
+    """
+    estatisticas = pstats.Stats(perfil).stats
+    ordenado = sorted(estatisticas.items(), key=lambda item: item[1][2], reverse=True)[:top]
+    return [
+        {
+            'funcao': f"{os.path.basename(arquivo)}:{linha}({funcao})",
+            'chamadas': chamadas,
+            'tempoProprioMs': round(tempoProprio * 1000, 1),
+            'tempoAcumuladoMs': round(tempoAcumulado * 1000, 1)
+        }
+        for (arquivo, linha, funcao), (_, chamadas, tempoProprio, tempoAcumulado, _) in ordenado
+    ]
+
+
+def gravar_resumo(diretorio, perfil, duracao, top):
+    """
+    Grava o resumo do perfilamento (resumo.json e resumo.txt) no diretório da execução.
+    """
+    acoes = []
+    requisicoes = []
+    for caminho in sorted(glob.glob(os.path.join(diretorio, 'trace-*.zip'))):
+        acoesTrace, requisicoesTrace = ler_eventos_trace(caminho)
+        acoes.extend(acoesTrace)
+        requisicoes.extend(requisicoesTrace)
+
+    resumo = {
+        'duracaoTotalMs': round(duracao * 1000, 1),
+        'passosNavegador': ranquear(acoes, top),
+        'requisicoes': ranquear(requisicoes, top),
+        'funcoesPython': ranquear_funcoes(perfil, top)
+    }
+
+    with open(os.path.join(diretorio, 'resumo.json'), 'w', encoding='utf-8') as arquivo:
+        json.dump(resumo, arquivo, ensure_ascii=False, indent=2)
+
+    linhas = [f"Duração total: {resumo['duracaoTotalMs']} ms", ""]
+    for titulo, chave in (("Passos do navegador", 'passosNavegador'), ("Requisições", 'requisicoes')):
+        linhas.append(f"{titulo} (total ms, chamadas):")
+        linhas.extend(f"  {item['totalMs']:>10} {item['chamadas']:>6}  {item['nome']}" for item in resumo[chave])
+        linhas.append("")
+    linhas.append("Funções Python (tempo próprio ms, tempo acumulado ms, chamadas):")
+    linhas.extend(
+        f"  {item['tempoProprioMs']:>10} {item['tempoAcumuladoMs']:>10} {item['chamadas']:>8}  {item['funcao']}"
+        for item in resumo['funcoesPython']
+    )
+
+    with open(os.path.join(diretorio, 'resumo.txt'), 'w', encoding='utf-8') as arquivo:
+        arquivo.write('\n'.join(linhas) + '\n')
@@ -0,0 +1,176 @@
+import sys
+from dataclasses import dataclass
+
+
+@dataclass(slots=True)
+class Turma:
+    """
+    Registro compacto de uma turma extraída da tabela de consulta de turmas.
+
+    Usa __slots__ em vez de um dicionário por instância, e as strings que se repetem entre turmas
+    (disciplina, código da disciplina, semestre, docentes, carga horária) são internadas com
+    `sys.intern`, de modo que todas as turmas de uma mesma disciplina compartilham os mesmos objetos.
+
+    Só o formato compacto (`formato_compacto`) reduz a memória do resultado: no formato padrão, cada
+    turma ainda é convertida para um dicionário com `como_dict`, e o ganho se limita às strings internadas.
+
+    Atributos:
+        nome_da_disciplina (str): Nome da disciplina.
+        codigo_da_disciplina (str): Código da disciplina.
+        semestre (str): Semestre da turma (ex.: "2024.1").
+        codigo_da_turma (str): Código da turma (ex.: "01").
+        professores (tuple): Nomes dos professores da turma.
+        cargaHoraria (str or None): Carga horária (ex.: "60h").
+        horario (str or None): Código de horário (ex.: "35N12").
+        alunos (str): Alunos matriculados e capacidade (ex.: "56/55 alunos").
+    """
+    nome_da_disciplina: str
+    codigo_da_disciplina: str
+    semestre: str
+    codigo_da_turma: str
+    professores: tuple
+    cargaHoraria: str | None
+    horario: str | None
+    alunos: str
+
+    @classmethod
+    def criar(cls, nome_da_disciplina, codigo_da_disciplina, semestre, codigo_da_turma, professores, cargaHoraria, horario, alunos):
+        """
+        Cria uma turma internando as strings repetidas.
+
+        Parâmetros:
+            professores (list): Lista de dicionários no formato retornado por `obterProfessoresCargaHoraria`.
+            Demais parâmetros conforme os atributos da classe.
+        """
+        return cls(
+            internar(nome_da_disciplina),
+            internar(codigo_da_disciplina),
+            internar(semestre),
+            codigo_da_turma,
+            tuple(internar(professor['nome']) for professor in professores),
+            internar(cargaHoraria),
+            horario,
+            alunos
+        )
+
+    @classmethod
+    def de_dict(cls, turma):
+        """
+        Cria uma turma a partir do dicionário no formato de saída padrão de `extrair_dados_tabela`.
+        """
+        return cls.criar(
+            turma.get('nome_da_disciplina'),
+            turma.get('codigo_da_disciplina'),
+            turma.get('semestre'),
+            turma.get('codigo_da_turma'),
+            turma.get('professores') or [],
+            turma.get('cargaHoraria'),
+            turma.get('horario'),
+            turma.get('alunos')
+        )
+
+    def como_dict(self):
+        """
+        Converte a turma para o dicionário do formato de saída padrão.
+        """
+        return {
+            'id': None,
+            'nome_da_disciplina': self.nome_da_disciplina,
+            'codigo_da_disciplina': self.codigo_da_disciplina,
+            'semestre': self.semestre,
+            'codigo_da_turma': self.codigo_da_turma,
+            'professores': [{'id': None, 'nome': nome} for nome in self.professores],
+            'cargaHoraria': self.cargaHoraria,
+            'horario': self.horario,
+            'alunos': self.alunos
+        }
+
+
+def internar(valor):
+    """
+    Interna uma string com `sys.intern`, preservando valores None.
+    """
+    return sys.intern(valor) if isinstance(valor, str) else valor
+
+
+def formato_compacto(turmas):
+    """
+    Converte uma lista de turmas para o formato de saída compacto.
+
+    No formato compacto, as turmas são agrupadas sob a sua disciplina, semestres e docentes são
+    referenciados pelo índice nas listas 'semestres' e 'docentes', e campos nulos ou vazios são omitidos.
+
+    Parâmetros:
+        turmas (list): Lista de objetos `Turma`.
+
+    Retorno:
+        dict: Um dicionário no formato:
+            {
+                'semestres': ['2024.1'],
+                'docentes': ['BRUNO OTAVIO PIEDADE PRADO'],
+                'disciplinas': [
+                    {
+                        'codigo': 'COMP0001',
+                        'nome': 'ARQUITETURA DE COMPUTADORES',
+                        'turmas': [
+                            {'turma': '01', 'semestre': 0, 'docentes': [0], 'cargaHoraria': '60h',
+                             'horario': '35N12', 'alunos': '56/55 alunos'}
+                        ]
+                    }
+                ]
+            }
+    """
+    semestres = {}
+    docentes = {}
+    disciplinas = {}
+
+    for turma in turmas:
+        chave = (turma.codigo_da_disciplina, turma.nome_da_disciplina)
+        disciplina = disciplinas.get(chave)
+        if disciplina is None:
+            disciplina = {k: v for k, v in (('codigo', turma.codigo_da_disciplina), ('nome', turma.nome_da_disciplina)) if v}
+            disciplina['turmas'] = []
+            disciplinas[chave] = disciplina
+
+        registro = {
+            'turma': turma.codigo_da_turma,
+            'semestre': semestres.setdefault(turma.semestre, len(semestres)) if turma.semestre else None,
+            'docentes': [docentes.setdefault(nome, len(docentes)) for nome in turma.professores],
+            'cargaHoraria': turma.cargaHoraria,
+            'horario': turma.horario,
+            'alunos': turma.alunos
+        }
+        disciplina['turmas'].append({k: v for k, v in registro.items() if v is not None and v != '' and v != []})
+
+    return {
+        'semestres': list(semestres),
+        'docentes': list(docentes),
+        'disciplinas': list(disciplinas.values())
+    }
+
+
+def expandir_compacto(compacto):
+    """
+    Converte o formato de saída compacto de volta para a lista de dicionários do formato padrão.
+
+    Parâmetros:
+        compacto (dict): Dicionário no formato retornado por `formato_compacto`.
+
+    Retorno:
+        generator: Gera um dicionário por turma, no formato de saída padrão.
+    """
+    semestres = compacto.get('semestres', [])
+    docentes = compacto.get('docentes', [])
+    for disciplina in compacto.get('disciplinas', []):
+        for turma in disciplina.get('turmas', []):
+            yield {
+                'id': None,
+                'nome_da_disciplina': disciplina.get('nome'),
+                'codigo_da_disciplina': disciplina.get('codigo'),
+                'semestre': semestres[turma['semestre']] if 'semestre' in turma else None,
+                'codigo_da_turma': turma.get('turma'),
+                'professores': [{'id': None, 'nome': docentes[indice]} for indice in turma.get('docentes', [])],
+                'cargaHoraria': turma.get('cargaHoraria'),
+                'horario': turma.get('horario'),
+                'alunos': turma.get('alunos')
+            }
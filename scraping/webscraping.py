@@ -1,46 +1,19 @@
-import sys
-from playwright.sync_api import sync_playwright
-import json
+if __name__ == "__main__":
+    # Execução direta como script (python scraping/webscraping.py '<json>'), mantida por compatibilidade:
+    # delega ao subcomando 'turmas' da linha de comando do pacote (ver `cli.principal`).
+    import os
+    import sys
+    sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+    from scraping.cli import principal
+    sys.exit(principal(['turmas'] + sys.argv[1:]))
 
+from .core import invalido, abrir_navegador, criar_contexto, fechar_contexto, fechar_navegador, abrir_pagina_autenticada, obter_erros, separar_har
+from .checkpoint import carregar_concluidas, chave_consulta, registrar_consulta
+from .registros import Turma, formato_compacto
 
-def obter_erros(page):
-    """
-    Obtém as mensagens de erro ou aviso exibidas em um painel da página.
 
-    A função tenta localizar um painel de erros representado por um <div> com o id 'painel-erros' e contendo uma 
-    lista desordenada (<ul>) com a classe 'erros' ou 'warning'. Se encontrar essas mensagens, as concatena em uma única string.
-
-    Parâmetros:
-        page (objeto): Objeto da página web que permite a interação com o conteúdo.
-
-    Retorno:
-        str: Mensagens de erro ou aviso concatenadas em uma string. Retorna "Nenhum erro encontrado." se nenhum erro for localizado.
-    
-    Exceções:
-        Retorna "Nenhum erro encontrado." em caso de exceção durante a execução.
-    """
-    try:
-        # Esperar até que uma <ul> com a classe "erros" ou "warning" esteja visível
-        page.locator("div[id='painel-erros'] ul.erros, div[id='painel-erros'] ul.warning").wait_for(state='visible', timeout=1000) 
-
-        # Tentar localizar a <ul> com a classe "erros"
-        ul_element = page.locator("div[id='painel-erros'] ul.erros")
-        
-        # Se não encontrar, tentar localizar a <ul> com a classe "warning"
-        if ul_element.count() == 0:
-            ul_element = page.locator("div[id='painel-erros'] ul.warning")
-        
-        # Verificar se a <ul> foi encontrada e se contém itens <li>
-        if ul_element.count() > 0:
-            erros_texto = [li.inner_text() for li in ul_element.locator('li').all()]
-            if erros_texto:
-                # Concatenar erros em uma única string, separados por ". "
-                return '. '.join(erros_texto)
-        return "Nenhum erro encontrado."
-    
-    except Exception as e:
-        # Caso ocorra algum erro, retornar uma mensagem padrão
-        return "Nenhum erro encontrado."
+# Aviso exibido pelo SIGAA no painel de erros quando a busca não retorna turmas
+AVISO_SEM_TURMAS = 'nenhuma turma encontrada'
 
 
 def obterProfessoresCargaHoraria(docentes):
@@ -89,7 +62,7 @@ def obterProfessoresCargaHoraria(docentes):
     return professores, cargaHoraria
 
 
-def extrair_dados_tabela(page, logs):
+def extrair_dados_tabela(page, logs, compacto=False):
     """
     Extrai dados de uma tabela HTML de turmas eletivas em uma página web, organizando os resultados em um dicionário.
 
@@ -98,11 +71,14 @@ def extrair_dados_tabela(page, logs):
     Parâmetros:
         page (object): Instância da página onde a tabela está localizada, fornecida por um framework de automação como Playwright.
         logs (list): Lista para armazenar mensagens de log durante a execução da função.
+        compacto (bool): Se verdadeiro, retorna as turmas no formato compacto (ver `registros.formato_compacto`).
 
     Retorno:
         dict: Um dicionário contendo:
             - logs (list): Lista com mensagens de log.
+            - extracaoConcluida (bool): Falso se a extração foi interrompida por um erro e as turmas estão incompletas.
             - turmasEletivas (list): Lista de dicionários contendo os dados de cada turma extraída da tabela.
+            No formato compacto, 'turmasEletivas' é substituída pelas chaves 'semestres', 'docentes' e 'disciplinas'.
 
     Exemplo de uso:
         resultado = extrair_dados_tabela(page, logs)
@@ -115,8 +91,9 @@ def extrair_dados_tabela(page, logs):
     """
     resultado = {
         'logs': logs,
-        'turmasEletivas': []
+        'extracaoConcluida': False
     }
+    turmas = []
 
     try:
         tabela = page.locator("table[id='lista-turmas']")  
@@ -139,30 +116,47 @@ def extrair_dados_tabela(page, logs):
             if dados_turma and len(dados_turma) >= 9:
                 docentes = dados_turma[2].inner_text().strip()
                 professores, cargaHoraria = obterProfessoresCargaHoraria(docentes)
-                turma_data = {
-                    'id': None,
-                    'nome_da_disciplina': disciplina,
-                    'codigo_da_disciplina': codDisciplina,
-                    'semestre': dados_turma[0].inner_text().strip(),
-                    'codigo_da_turma': dados_turma[1].inner_text().strip().split(' ')[1],
-                    'professores': professores,
-                    'cargaHoraria': cargaHoraria,
-                    'horario': dados_turma[6].inner_text().strip(),
-                    'alunos': dados_turma[8].inner_text().strip()
-                    # 'situacao': dados_turma[3].inner_text().strip(),
-                    # 'modalidade': dados_turma[4].inner_text().strip(),
-                    # 'status': dados_turma[5].inner_text().strip(),
-                    # 'local': dados_turma[7].inner_html().strip().replace('<br>', ' / ')
-                }
-                resultado['turmasEletivas'].append(turma_data)
+                turma = Turma.criar(
+                    nome_da_disciplina=disciplina,
+                    codigo_da_disciplina=codDisciplina,
+                    semestre=dados_turma[0].inner_text().strip(),
+                    codigo_da_turma=dados_turma[1].inner_text().strip().split(' ')[1],
+                    professores=professores,
+                    cargaHoraria=cargaHoraria,
+                    horario=dados_turma[6].inner_text().strip(),
+                    alunos=dados_turma[8].inner_text().strip()
+                    # situacao=dados_turma[3].inner_text().strip(),
+                    # modalidade=dados_turma[4].inner_text().strip(),
+                    # status=dados_turma[5].inner_text().strip(),
+                    # local=dados_turma[7].inner_html().strip().replace('<br>', ' / ')
+                )
+                turmas.append(turma)
 
         logs.append("Dados extraídos com sucesso")
-      
-        return resultado
+        resultado['extracaoConcluida'] = True
 
     except Exception as e:
         logs.append(f"Ocorreu um erro ao extrair os dados: {e}")
-        return resultado
+
+    resultado.update(formatar_turmas(turmas, compacto))
+    return resultado
+
+
+def formatar_turmas(turmas, compacto=False):
+    """
+    Monta a parte do resultado referente às turmas, no formato padrão ou no formato compacto.
+
+    Parâmetros:
+        turmas (list): Lista de objetos `Turma`.
+        compacto (bool): Se verdadeiro, usa o formato compacto (ver `registros.formato_compacto`).
+
+    Retorno:
+        dict: {'turmasEletivas': [...]} no formato padrão, ou as chaves 'semestres', 'docentes' e
+        'disciplinas' no formato compacto.
+    """
+    if compacto:
+        return formato_compacto(turmas)
+    return {'turmasEletivas': [turma.como_dict() for turma in turmas]}
 
 
 def aplicar_filtros(page, logs, params):
@@ -282,6 +276,58 @@ def aplicar_filtros(page, logs, params):
         logs.append(f"Erro ao clicar no botão 'Buscar': {e}")
 
 
+def navegar_consultar_turma(page, logs):
+    """
+    Navega, a partir do menu principal de um usuário logado no SIGAA, até a página "Consultar Turma".
+
+    Parâmetros:
+        page (object): Página do navegador com o cookie de autenticação já configurado no contexto.
+        logs (list): Lista para armazenar mensagens de log durante a execução da função.
+
+    Exceções:
+        As exceções do Playwright (por exemplo, quando o cookie expirou e o menu não é encontrado) são propagadas.
+    """
+    # Navega até a do menu principal de um usuário logado no SIGAA
+    page.goto('https://www.sigaa.ufs.br/sigaa/verMenuPrincipal.do')
+    logs.append("Acessou a página de Menu Principal do SIGAA.")
+
+    # Clicar no botão "Ciente" para aceitar os cookies
+
+    page.locator('text=Ciente').click()
+    logs.append("Aceitou os cookies.")
+
+    # Clicar no link "Portal Discente"
+
+    page.locator('a:has-text("Portal Discente")').click()
+    logs.append("Clicou em Portal Discente.")
+
+    # Passar o mouse sobre o item do menu "Ensino"
+
+    menu_item = page.locator('td.ThemeOfficeMainItem:has-text("Ensino")')
+    menu_item.hover()
+    logs.append("Passou o mouse sobre 'Ensino'.")
+
+    # Clicar no item do menu "Consultar Turma"
+
+    sub_menu_item = page.locator('td.ThemeOfficeMenuItemText:has-text("Consultar Turma")')
+    sub_menu_item.click()
+    logs.append("Clicou em 'Consultar Turma'.")
+
+
+def validar_turmas(params):
+    """
+    Valida os parâmetros do subcomando 'turmas' sem executá-lo.
+
+    Retorno:
+        dict or None: O retorno de parâmetros inválidos (ver `invalido`), ou None se forem válidos.
+    """
+    if 'consultas' in params:
+        consultas = params['consultas']
+        if not isinstance(consultas, list) or not all(isinstance(consulta, dict) for consulta in consultas):
+            return invalido("'consultas' deve ser uma lista de objetos com filtros.")
+    return None
+
+
 def main(playwright, params):
     """
     Executa a automação de navegação no sistema SIGAA, aplicando filtros e extraindo dados de turmas.
@@ -293,11 +339,17 @@ def main(playwright, params):
         playwright (object): Instância do Playwright para automação de navegador.
         params (dict): Dicionário contendo os parâmetros para a execução, com possíveis chaves:
             - 'userData' (str): Cookie de autenticação JSESSIONID do usuário no SIGAA.
+            - 'headless' (bool): Executa o navegador sem interface gráfica (padrão: False).
+            - 'gravarHar' (str): Grava toda a troca de rede da execução neste arquivo HAR.
+            - 'reproduzirHar' (str): Serve as respostas a partir deste arquivo HAR, sem acesso à rede.
+            - 'formatoSaida' (str): 'compacto' para agrupar as turmas por disciplina (ver `registros.formato_compacto`).
             - Demais parâmetros usados para a função `aplicar_filtros`.
 
     Retorno:
         dict: Um dicionário com os resultados da extração de dados das turmas e os logs da operação. 
         Em caso de erro, retorna um dicionário com a mensagem de erro e o status HTTP 500.
+        Se os filtros exibirem um erro (exceto o aviso de busca sem turmas) ou a extração for interrompida,
+        o status é 200 e 'extracaoConcluida' é falso.
 
     Exemplo de uso:
         resultado = main(playwright, {
@@ -322,49 +374,16 @@ def main(playwright, params):
         - Funções `aplicar_filtros`, `obter_erros` e `extrair_dados_tabela` são chamadas durante o processo.
     """
     logs = []
+    context = None
+    browser = None
 
     try:
-        browser = playwright.chromium.launch(headless=False)
-        context = browser.new_context()
-        userData = params.get('userData', '')
-        context.add_cookies([
-            {
-                'name': 'JSESSIONID',
-                'value': userData,
-                'domain': 'www.sigaa.ufs.br',
-                'path': '/'
-            }
-        ])
-
-        # Criar uma nova página e navegar para o site com os cookies
-        page = context.new_page()
-        logs.append("Abriu o navegador.")
-
-        # Navega até a do menu principal de um usuário logado no SIGAA
-        page.goto('https://www.sigaa.ufs.br/sigaa/verMenuPrincipal.do')
-        logs.append("Acessou a página de Menu Principal do SIGAA.")
-
-        # Clicar no botão "Ciente" para aceitar os cookies
-    
-        page.locator('text=Ciente').click()
-        logs.append("Aceitou os cookies.")
+        browser = abrir_navegador(playwright, params)
+        context = criar_contexto(browser, params, logs)
+        page = abrir_pagina_autenticada(context, params, logs)
 
-        # Clicar no link "Portal Discente"
-    
-        page.locator('a:has-text("Portal Discente")').click()
-        logs.append("Clicou em Portal Discente.")
-
-        # Passar o mouse sobre o item do menu "Ensino"
-        
-        menu_item = page.locator('td.ThemeOfficeMainItem:has-text("Ensino")')
-        menu_item.hover()
-        logs.append("Passou o mouse sobre 'Ensino'.")
-
-        # Clicar no item do menu "Consultar Turma"
-        
-        sub_menu_item = page.locator('td.ThemeOfficeMenuItemText:has-text("Consultar Turma")')
-        sub_menu_item.click()
-        logs.append("Clicou em 'Consultar Turma'.")
+        # Navegar até a página "Consultar Turma"
+        navegar_consultar_turma(page, logs)
 
         # Aplicar filtros
         aplicar_filtros(page, logs, params)
@@ -375,13 +394,16 @@ def main(playwright, params):
         # Verificar se há erros e decidir o resultado
         if resultadoFiltros != 'Nenhum erro encontrado.':
             logs.append(f"Erro ao aplicar filtros: {resultadoFiltros}")
-            resultado = { 'logs': logs }
+            # A busca sem resultados também é exibida no painel, mas é uma consulta concluída sem turmas
+            resultado = { 'logs': logs, 'extracaoConcluida': AVISO_SEM_TURMAS in resultadoFiltros.lower() }
+            if resultado['extracaoConcluida']:
+                resultado.update(formatar_turmas([], params.get('formatoSaida') == 'compacto'))
         else:
             logs.append("Nenhum erro encontrado ao aplicar os filtros.")
-            resultado = extrair_dados_tabela(page, logs)
+            resultado = extrair_dados_tabela(page, logs, params.get('formatoSaida') == 'compacto')
 
-        # Fechar o navegador
-        browser.close()
+        # Fechar o contexto (o navegador é fechado no bloco finally)
+        fechar_contexto(context, params, logs)
 
         return {
             'resultado': resultado,
@@ -390,33 +412,123 @@ def main(playwright, params):
 
     except Exception as e:
         logs.append(f"Ocorreu um erro: {str(e)}")
+        fechar_contexto(context, params, logs)
         return {
             'resultado': str(e),
             'status': 500
         }
+    finally:
+        fechar_navegador(browser, logs)
 
-   
-if __name__ == "__main__":
+
+def executar_consultas(playwright, params):
+    """
+    Executa uma coleta composta por várias sub-consultas, com checkpoint em disco para retomada.
+
+    Cada item de 'consultas' é combinado com os demais parâmetros (como 'userData') e executado pela
+    função `main`. Ao concluir uma sub-consulta com sucesso (status 200 e 'extracaoConcluida' verdadeiro),
+    seus filtros, o hash do resultado e as turmas extraídas são gravados no arquivo de checkpoint. Ao reiniciar a coleta com o mesmo
+    checkpoint, as sub-consultas já concluídas são ignoradas e a execução continua a partir da
+    primeira pendente. A coleta é interrompida na primeira falha (por exemplo, cookie expirado ou
+    timeout do SIGAA), para que possa ser retomada daquele ponto.
+
+    Parâmetros:
+        playwright (object): Instância do Playwright para automação de navegador.
+        params (dict): Dicionário contendo os parâmetros para a execução, com possíveis chaves:
+            - 'userData' (str): Cookie de autenticação JSESSIONID do usuário no SIGAA.
+            - 'consultas' (list): Lista de dicionários com os filtros de cada sub-consulta.
+            - 'checkpoint' (str): Caminho do arquivo de checkpoint (JSON Lines).
+            - 'gravarHar', 'reproduzirHar' (str): Cada sub-consulta usa o seu próprio arquivo, com o sufixo
+              '-consulta-N' (ver `core.separar_har`).
+            - Demais parâmetros são aplicados a todas as sub-consultas.
+
+    Retorno:
+        dict: Um dicionário com as turmas de todas as sub-consultas concluídas (incluindo as de execuções
+        anteriores), a quantidade de sub-consultas concluídas e pendentes e os logs da operação.
+        O status é 200 se todas as sub-consultas foram concluídas e 500 se a coleta foi interrompida.
+
+    Exemplo de uso:
+        resultado = executar_consultas(playwright, {
+            'userData': 'cookie_value',
+            'checkpoint': 'data/coleta.jsonl',
+            'consultas': [
+                {'departamento': 'DEPARTAMENTO DE COMPUTAÇÃO - São Cristóvão'},
+                {'departamento': 'DEPARTAMENTO DE MATEMÁTICA - São Cristóvão'}
+            ]
+        })
     """
-    Função principal que será executada quando o script for rodado diretamente.
+    logs = []
+    caminho = params.get('checkpoint', '')
+    consultas = params.get('consultas', [])
+    # As sub-consultas são sempre gravadas no formato padrão; o formato compacto é aplicado ao final
+    base = {k: v for k, v in params.items() if k not in ('consultas', 'checkpoint', 'formatoSaida')}
+
+    concluidas = carregar_concluidas(caminho) if caminho else {}
+    logs.append(f"{len(concluidas)} sub-consulta(s) já concluída(s) no checkpoint.")
+
+    turmas = []
+    quantidadeConcluidas = 0
+    status = 200
+
+    for indice, consulta in enumerate(consultas):
+        consultaParams = separar_har({**base, **consulta}, f"consulta-{indice}")
+        chave = chave_consulta(consultaParams)
+
+        if chave in concluidas:
+            turmas.extend(concluidas[chave]['resultado'].get('turmasEletivas', []))
+            quantidadeConcluidas += 1
+            logs.append(f"Sub-consulta {indice} já concluída, ignorada.")
+            continue
+
+        retorno = main(playwright, consultaParams)
+        if retorno['status'] != 200:
+            logs.append(f"Sub-consulta {indice} falhou: {retorno['resultado']}. Coleta interrompida.")
+            status = retorno['status']
+            break
+
+        resultado = retorno['resultado']
+        if not resultado.get('extracaoConcluida'):
+            # Erro nos filtros ou extração interrompida: a sub-consulta não é gravada, para ser refeita
+            motivo = next((log for log in reversed(resultado['logs']) if 'erro' in log.lower()), 'extração incompleta')
+            logs.append(f"Sub-consulta {indice} falhou: {motivo}. Coleta interrompida.")
+            status = 500
+            break
+
+        if caminho:
+            registrar_consulta(caminho, consultaParams, resultado)
+        turmas.extend(resultado.get('turmasEletivas', []))
+        quantidadeConcluidas += 1
+        logs.append(f"Sub-consulta {indice} concluída.")
+
+    resultado = {'logs': logs}
+    if params.get('formatoSaida') == 'compacto':
+        resultado.update(formatar_turmas([Turma.de_dict(turma) for turma in turmas], compacto=True))
+    else:
+        # As turmas já estão no formato padrão: evita a conversão dicionário -> Turma -> dicionário
+        resultado['turmasEletivas'] = turmas
+    resultado['consultasConcluidas'] = quantidadeConcluidas
+    resultado['consultasPendentes'] = len(consultas) - quantidadeConcluidas
+
+    return {
+        'resultado': resultado,
+        'status': status
+    }
 
-    Descrição:
-        - A função obtém os parâmetros passados via linha de comando (CLI) e os utiliza para chamar a função `main`.
-        - Usa `sync_playwright` para iniciar a automação com Playwright.
-        - Os resultados da função `main` são convertidos para JSON e impressos na saída padrão (normalmente o console).
+
+def consultas_pendentes(params):
+    """
+    Retorna a quantidade de sub-consultas de `executar_consultas` que ainda não constam no checkpoint.
+
+    Quando todas já foram concluídas, `executar_consultas` pode ser chamada sem iniciar o Playwright
+    (com playwright=None), apenas reunindo os resultados gravados.
 
     Parâmetros:
-        Nenhum parâmetro direto. Os parâmetros são passados como argumento via linha de comando no formato JSON.
+        params (dict): Parâmetros no formato de `executar_consultas`.
 
-    Exemplo de uso via CLI:
-        python scraping/webscraping.py '{"userData": "JSSESSION COOKIE AQUI", "modalidadeCurso": "PRESENCIAL", "modalidadeTurma": "PRESENCIAL", "centroOuCampus": "CENTRO DE CIÊNCIAS EXATAS E TECNOLOGIA", "departamento": "DEPARTAMENTO DE COMPUTAÇÃO - São Cristóvão", "nomeComponente": "ARQUITETURA DE COMPUTADORES"}'
-    
-    Dependências:
-        - Módulo `json` para carregar os parâmetros de entrada e serializar os resultados para JSON.
-        - Módulo `sys` para acessar os argumentos passados via linha de comando.
-        - `sync_playwright` é usado para realizar a automação de navegador de maneira síncrona.
+    Retorno:
+        int: Quantidade de sub-consultas pendentes.
     """
-    params = json.loads(sys.argv[1])
-    with sync_playwright() as playwright:
-        resultado = main(playwright, params)
-        print(json.dumps(resultado)) 
\ No newline at end of file
+    caminho = params.get('checkpoint', '')
+    concluidas = carregar_concluidas(caminho) if caminho else {}
+    base = {k: v for k, v in params.items() if k not in ('consultas', 'checkpoint', 'formatoSaida')}
+    return sum(1 for consulta in params.get('consultas', []) if chave_consulta({**base, **consulta}) not in concluidas)
@@ -1,6 +1,13 @@
-import sys
-from playwright.sync_api import sync_playwright
-import json
+if __name__ == "__main__":
+    # Execução direta como script (python scraping/webscrapingAutentication.py '<json>'), mantida por compatibilidade:
+    # delega ao subcomando 'login' da linha de comando do pacote (ver `cli.principal`).
+    import os
+    import sys
+    sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+    from scraping.cli import principal
+    sys.exit(principal(['login'] + sys.argv[1:]))
+
+from .core import abrir_navegador, criar_contexto, fechar_contexto, fechar_navegador
 
 
 def main(playwright, params):
@@ -10,6 +17,8 @@ def main(playwright, params):
     Parâmetros:
     - playwright (Playwright): Instância do Playwright usada para interagir com o navegador.
     - params (dict): Dicionário contendo os parâmetros para o login, incluindo 'login' e 'password'.
+      Aceita também 'headless', 'gravarHar' e 'reproduzirHar' (ver `core.criar_contexto`).
+      Atenção: o HAR gravado contém a senha enviada no formulário de login.
 
     Retorna:
     - dict: Resultado da operação com os seguintes possíveis campos:
@@ -19,11 +28,14 @@ def main(playwright, params):
         - 'status': Código de status HTTP (200 para sucesso, 400 para erro de login, 404 para cookie não encontrado, 500 para erro inesperado).
     """
     logs = []
+    context = None
+    browser = None
 
     try:
 
-        browser = playwright.chromium.launch(headless=False)
-        page = browser.new_page()
+        browser = abrir_navegador(playwright, params)
+        context = criar_contexto(browser, params, logs)
+        page = context.new_page()
 
         # Navega até a página de login do SIGAA
         page.goto('https://www.sigaa.ufs.br/sigaa/verTelaLogin.do')
@@ -44,6 +56,7 @@ def main(playwright, params):
 
         # Verifica se o login foi bem-sucedido (você pode ajustar conforme a resposta do site)
         if "Usuário e/ou senha inválidos" in page.content():
+            fechar_contexto(context, params, logs)
             return {
                 'error': 'Usuário e/ou senha inválidos',
                 'status': 400
@@ -60,13 +73,14 @@ def main(playwright, params):
                 break
 
         if jsessionid == None: 
+            fechar_contexto(context, params, logs)
             return {
                 'error': 'Cookie JSESSIONID não encontrado.',
                 'status': 404
             }  
 
-        # Fechar o navegador
-        browser.close()
+        # Fechar o contexto (o navegador é fechado no bloco finally)
+        fechar_contexto(context, params, logs)
         return {
             'logs': logs,
             'JSESSIONID': jsessionid,
@@ -74,33 +88,10 @@ def main(playwright, params):
         }
     except Exception as e:
         logs.append(f"Ocorreu um erro: {str(e)}")
+        fechar_contexto(context, params, logs)
         return {
             'error': str(e),
             'status': 500
         }
-   
-
-if __name__ == "__main__":
-    """
-    Função principal que será executada quando o script for rodado diretamente.
-
-    Descrição:
-        - A função obtém os parâmetros passados via linha de comando (CLI) e os utiliza para chamar a função `main`.
-        - Usa `sync_playwright` para iniciar a automação com Playwright.
-        - Os resultados da função `main` são convertidos para JSON e impressos na saída padrão (normalmente o console).
-
-    Parâmetros:
-        Nenhum parâmetro direto. Os parâmetros são passados como argumento via linha de comando no formato JSON.
-
-    Exemplo de uso via CLI:
-        python scraping/webscrapingAutentication.py '{"login": "SEU USER", "password": "SUA SENHA"}'
-    
-    Dependências:
-        - Módulo `json` para carregar os parâmetros de entrada e serializar os resultados para JSON.
-        - Módulo `sys` para acessar os argumentos passados via linha de comando.
-        - `sync_playwright` é usado para realizar a automação de navegador de maneira síncrona.
-    """
-    params = json.loads(sys.argv[1])
-    with sync_playwright() as playwright:
-        resultado = main(playwright, params)
-        print(json.dumps(resultado)) 
\ No newline at end of file
+    finally:
+        fechar_navegador(browser, logs)
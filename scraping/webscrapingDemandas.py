@@ -1,83 +1,76 @@
-import sys
-from playwright.sync_api import sync_playwright
-import json
+if __name__ == "__main__":
+    # Execução direta como script (python scraping/webscrapingDemandas.py '<json>'), mantida por compatibilidade:
+    # delega ao subcomando 'demandas' da linha de comando do pacote (ver `cli.principal`).
+    import os
+    import sys
+    sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+    from scraping.cli import principal
+    sys.exit(principal(['demandas'] + sys.argv[1:]))
+
+import re
+from .core import invalido, abrir_navegador, criar_contexto, fechar_contexto, fechar_navegador, abrir_pagina_autenticada, obter_erros, separar_har
+from .indiceAptos import IndiceAlunosAptos
+
+
+# Lê, em uma única chamada ao navegador, o texto das células de cada linha do relatório
+LER_LINHAS_JS = "(linhas) => linhas.map((linha) => Array.from(linha.querySelectorAll('td'), (td) => td.innerText.trim()))"
 
 
-def obter_erros(page):
+def extrair_aluno(celulas):
     """
-    Obtém as mensagens de erro ou aviso exibidas em um painel da página.
+    Extrai a matrícula de um aluno a partir das células de uma linha do relatório.
 
-    A função tenta localizar um painel de erros representado por um <div> com o id 'painel-erros' e contendo uma 
-    lista desordenada (<ul>) com a classe 'erros' ou 'warning'. Se encontrar essas mensagens, as concatena em uma única string.
+    A matrícula é a primeira célula composta apenas por dígitos e com ao menos 6 deles (o que
+    descarta colunas de numeração). O nome e os demais dados pessoais da linha não são lidos.
 
     Parâmetros:
-        page (objeto): Objeto da página web que permite a interação com o conteúdo.
+        celulas (list): Textos das células da linha.
 
     Retorno:
-        str: Mensagens de erro ou aviso concatenadas em uma string. Retorna "Nenhum erro encontrado." se nenhum erro for localizado.
-    
-    Exceções:
-        Retorna "Nenhum erro encontrado." em caso de exceção durante a execução.
+        str or None: A matrícula, ou None se a linha não contiver uma matrícula.
     """
-    try:
-        # Esperar até que uma <ul> com a classe "erros" ou "warning" esteja visível
-        page.locator("div[id='painel-erros'] ul.erros, div[id='painel-erros'] ul.warning").wait_for(state='visible', timeout=1000) 
+    return next((celula for celula in celulas if celula.isdigit() and len(celula) >= 6), None)
 
-        # Tentar localizar a <ul> com a classe "erros"
-        ul_element = page.locator("div[id='painel-erros'] ul.erros")
-        
-        # Se não encontrar, tentar localizar a <ul> com a classe "warning"
-        if ul_element.count() == 0:
-            ul_element = page.locator("div[id='painel-erros'] ul.warning")
-        
-        # Verificar se a <ul> foi encontrada e se contém itens <li>
-        if ul_element.count() > 0:
-            erros_texto = [li.inner_text() for li in ul_element.locator('li').all()]
-            if erros_texto:
-                # Concatenar erros em uma única string, separados por ". "
-                return '. '.join(erros_texto)
-        return "Nenhum erro encontrado."
-    
-    except Exception as e:
-        # Caso ocorra algum erro, retornar uma mensagem padrão
-        return "Nenhum erro encontrado."
 
-
-def extrair_dados_tabela(page, logs):
+def extrair_dados_tabela(page, logs, incluirAlunos=False):
     """
-    Extrai dados de uma tabela HTML de turmas eletivas em uma página web, organizando os resultados em um dicionário.
+    Extrai os alunos aptos a cursar o componente curricular do relatório "Matriz Curricular".
 
-    A função busca por uma tabela de turmas no HTML da página, percorre suas linhas e extrai informações como nome da disciplina, código, semestre, professores, carga horária, horário e número de alunos. O resultado final é armazenado em um dicionário, que inclui as turmas encontradas e os logs de execução.
+    A função localiza a tabela do relatório, conta as suas linhas e identifica a matrícula de cada linha.
+    O texto de todas as linhas é lido em uma única chamada ao navegador. As matrículas só são incluídas
+    no resultado quando solicitado, já que são dados pessoais dos alunos.
 
     Parâmetros:
         page (object): Instância da página onde a tabela está localizada, fornecida por um framework de automação como Playwright.
         logs (list): Lista para armazenar mensagens de log durante a execução da função.
+        incluirAlunos (bool): Se verdadeiro, inclui a lista de matrículas no resultado (usado por `executar_componentes`).
 
     Retorno:
         dict: Um dicionário contendo:
             - logs (list): Lista com mensagens de log.
-            - turmasEletivas (list): Lista de dicionários contendo os dados de cada turma extraída da tabela.
-
-    Exemplo de uso:
-        resultado = extrair_dados_tabela(page, logs)
-        # retorno será um dicionário com logs e uma lista de turmas, cada uma contendo:
-        # 'nome_da_disciplina', 'codigo_da_disciplina', 'semestre', 'codigo_da_turma',
-        # 'professores', 'cargaHoraria', 'horario', e 'alunos'.
+            - alunosAptos (int): Quantidade de linhas do relatório.
+            - alunosIdentificados (int): Quantidade de linhas em que foi encontrada uma matrícula.
+            - alunos (list): Matrículas dos alunos aptos, apenas se 'incluirAlunos' for verdadeiro.
 
     Tratamento de exceções:
         - Em caso de erro durante a extração dos dados, uma mensagem de erro é adicionada aos logs e o resultado parcial é retornado.
     """
     resultado = {
         'logs': logs,
-        'alunosAptos': 0
+        'alunosAptos': 0,
+        'alunosIdentificados': 0
     }
 
     try:
         tabela = page.locator("table:has-text('Matriz Curricular')")
         if tabela.count() > 0:
             tbody = tabela.locator("tbody")
-            quantidade_tr = tbody.locator("tr").count()
-            resultado['alunosAptos'] = quantidade_tr
+            linhas = tbody.locator("tr").evaluate_all(LER_LINHAS_JS)
+            matriculas = [matricula for matricula in map(extrair_aluno, linhas) if matricula]
+            resultado['alunosAptos'] = len(linhas)
+            resultado['alunosIdentificados'] = len(matriculas)
+            if incluirAlunos:
+                resultado['alunos'] = matriculas
         else:
             logs.append("Tabela 'Matriz Curricular' não encontrada.")
         logs.append("Quantidade de alunos aptos extraída com sucesso.")
@@ -167,6 +160,23 @@ def aplicar_filtros(page, logs, params):
         logs.append(f"Erro ao clicar no botão 'Gerar Relatório': {e}")
 
 
+def validar_demandas(params):
+    """
+    Valida os parâmetros do subcomando 'demandas' sem executá-lo.
+
+    Retorno:
+        dict or None: O retorno de parâmetros inválidos (ver `invalido`), ou None se forem válidos.
+    """
+    if not re.fullmatch(r'\d{4}\.\d', str(params.get('anoPeriodoIngresso', ''))):
+        return invalido("'anoPeriodoIngresso' deve estar no formato 'AAAA.P' (ex.: '2020.1').")
+    if 'componentesCurriculares' in params:
+        if not isinstance(params['componentesCurriculares'], list) or not params['componentesCurriculares']:
+            return invalido("'componentesCurriculares' deve ser uma lista não vazia.")
+    elif not params.get('componenteCurricular'):
+        return invalido("informe 'componenteCurricular' ou 'componentesCurriculares'.")
+    return None
+
+
 def main(playwright, params):
     """
     Executa a automação de navegação no sistema SIGAA, aplicando filtros e extraindo dados de turmas.
@@ -178,6 +188,9 @@ def main(playwright, params):
         playwright (object): Instância do Playwright para automação de navegador.
         params (dict): Dicionário contendo os parâmetros para a execução, com possíveis chaves:
             - 'userData' (str): Cookie de autenticação JSESSIONID do usuário no SIGAA.
+            - 'headless' (bool): Executa o navegador sem interface gráfica (padrão: False).
+            - 'gravarHar' (str): Grava toda a troca de rede da execução neste arquivo HAR.
+            - 'reproduzirHar' (str): Serve as respostas a partir deste arquivo HAR, sem acesso à rede.
             - Demais parâmetros usados para a função `aplicar_filtros`.
 
     Retorno:
@@ -207,23 +220,13 @@ def main(playwright, params):
         - Funções `aplicar_filtros`, `obter_erros` e `extrair_dados_tabela` são chamadas durante o processo.
     """
     logs = []
+    context = None
+    browser = None
 
     try:
-        browser = playwright.chromium.launch(headless=False)
-        context = browser.new_context()
-        userData = params.get('userData', '')
-        context.add_cookies([
-            {
-                'name': 'JSESSIONID',
-                'value': userData,
-                'domain': 'www.sigaa.ufs.br',
-                'path': '/'
-            }
-        ])
-
-        # Criar uma nova página e navegar para o site com os cookies
-        page = context.new_page()
-        logs.append("Abriu o navegador.")
+        browser = abrir_navegador(playwright, params)
+        context = criar_contexto(browser, params, logs)
+        page = abrir_pagina_autenticada(context, params, logs)
 
         # Navega até a do menu principal de um usuário logado no SIGAA
         page.goto('https://www.sigaa.ufs.br/sigaa/verMenuPrincipal.do')
@@ -282,10 +285,13 @@ def main(playwright, params):
             resultado = { 'logs': logs }
         else:
             logs.append("Nenhum erro encontrado ao aplicar os filtros.")
-            resultado = extrair_dados_tabela(page, logs)
+            resultado = extrair_dados_tabela(page, logs, params.get('_incluirAlunos', False))
+            # Identificar a demanda no resultado, para que ele possa ser exportado isoladamente
+            resultado['componenteCurricular'] = params.get('componenteCurricular', '')
+            resultado['anoPeriodoIngresso'] = params.get('anoPeriodoIngresso', '')
 
-        # Fechar o navegador
-        browser.close()
+        # Fechar o contexto (o navegador é fechado no bloco finally)
+        fechar_contexto(context, params, logs)
 
         return {
             'resultado': resultado,
@@ -294,33 +300,73 @@ def main(playwright, params):
 
     except Exception as e:
         logs.append(f"Ocorreu um erro: {str(e)}")
+        fechar_contexto(context, params, logs)
         return {
             'resultado': str(e),
             'status': 500
         }
+    finally:
+        fechar_navegador(browser, logs)
 
-   
-if __name__ == "__main__":
+
+def executar_componentes(playwright, params):
     """
-    Função principal que será executada quando o script for rodado diretamente.
+    Gera o relatório de alunos aptos para vários componentes curriculares e agrega a demanda entre eles.
 
-    Descrição:
-        - A função obtém os parâmetros passados via linha de comando (CLI) e os utiliza para chamar a função `main`.
-        - Usa `sync_playwright` para iniciar a automação com Playwright.
-        - Os resultados da função `main` são convertidos para JSON e impressos na saída padrão (normalmente o console).
+    As matrículas de cada relatório são registradas em um `IndiceAlunosAptos`, que guarda apenas ids e um
+    bitset por componente, e não fazem parte do resultado. A partir dele são calculados os alunos aptos a
+    cada componente, os alunos exclusivos de cada um e as sobreposições entre pares de componentes. Se
+    'indice' for informado, o índice (apenas matrículas, sem nomes) é gravado em disco para consultas
+    posteriores sem gerar os relatórios novamente (ver `indiceAptos.py`).
 
     Parâmetros:
-        Nenhum parâmetro direto. Os parâmetros são passados como argumento via linha de comando no formato JSON.
+        playwright (object): Instância do Playwright para automação de navegador.
+        params (dict): Dicionário contendo os parâmetros para a execução, com possíveis chaves:
+            - 'userData' (str): Cookie de autenticação JSESSIONID do usuário no SIGAA.
+            - 'componentesCurriculares' (list): Componentes curriculares a consultar.
+            - 'anoPeriodoIngresso' (str): Ano e período de ingresso (ex.: "2020.1").
+            - 'indice' (str): Caminho do arquivo JSON onde o índice de alunos aptos é gravado.
+            - 'gravarHar', 'reproduzirHar' (str): Cada componente usa o seu próprio arquivo, com o código do
+              componente como sufixo (ver `core.separar_har`).
+            - Demais parâmetros são repassados para a função `main`.
 
-    Exemplo de uso via CLI:
-        python scraping/webscraping.py '{"userData": "JSSESSION COOKIE AQUI", "modalidadeCurso": "PRESENCIAL", "modalidadeTurma": "PRESENCIAL", "centroOuCampus": "CENTRO DE CIÊNCIAS EXATAS E TECNOLOGIA", "departamento": "DEPARTAMENTO DE COMPUTAÇÃO - São Cristóvão", "nomeComponente": "ARQUITETURA DE COMPUTADORES"}'
-    
-    Dependências:
-        - Módulo `json` para carregar os parâmetros de entrada e serializar os resultados para JSON.
-        - Módulo `sys` para acessar os argumentos passados via linha de comando.
-        - `sync_playwright` é usado para realizar a automação de navegador de maneira síncrona.
+    Retorno:
+        dict: Um dicionário com a quantidade de alunos aptos (linhas do relatório) e de matrículas identificadas
+        por componente, os números agregados (ver `IndiceAlunosAptos.resumo`, calculados sobre as matrículas
+        identificadas) e os logs da operação. O status é 500 se algum relatório falhar.
     """
-    params = json.loads(sys.argv[1])
-    with sync_playwright() as playwright:
-        resultado = main(playwright, params)
-        print(json.dumps(resultado)) 
\ No newline at end of file
+    logs = []
+    indice = IndiceAlunosAptos()
+    demandas = []
+    status = 200
+
+    base = {k: v for k, v in params.items() if k not in ('componentesCurriculares', 'indice')}
+    for componente in params.get('componentesCurriculares', []):
+        retorno = main(playwright, separar_har({**base, 'componenteCurricular': componente, '_incluirAlunos': True}, componente))
+        if retorno['status'] != 200 or 'alunos' not in retorno['resultado']:
+            logs.append(f"Falha ao gerar o relatório do componente '{componente}': {retorno['resultado']}")
+            status = 500
+            continue
+
+        resultado = retorno['resultado']
+        indice.adicionar(componente, resultado['alunos'])
+        demandas.append({
+            'componenteCurricular': componente,
+            'anoPeriodoIngresso': resultado['anoPeriodoIngresso'],
+            'alunosAptos': resultado['alunosAptos'],
+            'alunosIdentificados': resultado['alunosIdentificados']
+        })
+        logs.append(f"Relatório do componente '{componente}' gerado.")
+
+    if params.get('indice'):
+        indice.salvar(params['indice'])
+        logs.append(f"Índice de alunos aptos gravado em '{params['indice']}'.")
+
+    return {
+        'resultado': {
+            'logs': logs,
+            'demandas': demandas,
+            'agregado': indice.resumo()
+        },
+        'status': status
+    }
@@ -0,0 +1,269 @@
+import sys
+import json
+import time
+import urllib.request
+from datetime import datetime
+from .core import abrir_navegador, criar_contexto, fechar_contexto, fechar_navegador, abrir_pagina_autenticada, obter_erros
+from .webscraping import AVISO_SEM_TURMAS, aplicar_filtros, navegar_consultar_turma
+
+
+# Lê, em uma única chamada ao navegador, o semestre, o código da disciplina, o código da turma e a coluna
+# de alunos de cada linha da tabela de turmas, sem extrair as demais colunas. O código da turma é a última
+# palavra da coluna (ex.: "Turma 01" -> "01").
+LER_ALUNOS_JS = """
+(linhas) => {
+    const turmas = [];
+    let codigoDisciplina = '';
+    for (const linha of linhas) {
+        const cabecalho = linha.querySelector('td[colspan="17"]');
+        if (cabecalho) {
+            codigoDisciplina = cabecalho.innerText.split(' - ')[0].trim();
+            continue;
+        }
+        const colunas = linha.querySelectorAll('td');
+        if (colunas.length >= 9) {
+            turmas.push([
+                colunas[0].innerText.trim(),
+                codigoDisciplina,
+                colunas[1].innerText.trim().split(/\s+/).pop(),
+                colunas[8].innerText.trim()
+            ]);
+        }
+    }
+    return turmas;
+}
+"""
+
+
+def ler_alunos(page):
+    """
+    Lê a coluna de alunos da tabela de turmas.
+
+    Parâmetros:
+        page (object): Página com o resultado da consulta de turmas.
+
+    Retorno:
+        dict: Dicionário no formato {"SEMESTRE-CODIGO_DISCIPLINA-CODIGO_TURMA": "56/55 alunos"}
+        (ex.: {"2024.1-COMP0415-01": "56/55 alunos"}). O semestre faz parte da chave para que turmas de
+        semestres diferentes, com os mesmos códigos, não se sobrescrevam.
+    """
+    linhas = page.locator("table[id='lista-turmas'] tbody tr").evaluate_all(LER_ALUNOS_JS)
+    return {
+        f"{semestre}-{codigoDisciplina}-{codigoTurma}": alunos
+        for semestre, codigoDisciplina, codigoTurma, alunos in linhas
+    }
+
+
+def comparar_alunos(anterior, atual):
+    """
+    Compara duas leituras da coluna de alunos e retorna os eventos de mudança.
+
+    Retorno:
+        list: Eventos com a chave 'evento' igual a 'alteracao', 'nova' ou 'removida'.
+    """
+    eventos = []
+    for turma, alunos in atual.items():
+        if turma not in anterior:
+            eventos.append({'evento': 'nova', 'turma': turma, 'alunos': alunos})
+        elif anterior[turma] != alunos:
+            eventos.append({'evento': 'alteracao', 'turma': turma, 'alunosAnterior': anterior[turma], 'alunos': alunos})
+    for turma, alunos in anterior.items():
+        if turma not in atual:
+            eventos.append({'evento': 'removida', 'turma': turma, 'alunosAnterior': alunos})
+    return eventos
+
+
+def emitir_evento(evento, webhook):
+    """
+    Publica um evento como uma linha JSON (NDJSON) na saída padrão ou, se informado, envia-o por POST ao webhook.
+
+    Falhas no envio ao webhook são reportadas na saída de erro e não interrompem o monitoramento.
+    """
+    evento['horario'] = datetime.now().isoformat(timespec='seconds')
+    corpo = json.dumps(evento, ensure_ascii=False)
+
+    if not webhook:
+        print(corpo, flush=True)
+        return
+
+    try:
+        requisicao = urllib.request.Request(
+            webhook,
+            data=corpo.encode('utf-8'),
+            headers={'Content-Type': 'application/json'},
+            method='POST'
+        )
+        urllib.request.urlopen(requisicao, timeout=5).close()
+    except Exception as e:
+        print(f"Erro ao enviar evento ao webhook '{webhook}': {e}", file=sys.stderr, flush=True)
+
+
+def verificar_resultado(page):
+    """
+    Verifica se a página exibe a tabela de turmas de uma busca bem-sucedida.
+
+    Deve ser chamada antes de cada leitura, para que uma página de erro ou sem a tabela não seja
+    lida como uma consulta sem turmas. O aviso de busca sem turmas (`webscraping.AVISO_SEM_TURMAS`)
+    não é um erro, assim como em `webscraping.main`.
+
+    Retorno:
+        bool: Verdadeiro se a tabela de turmas estiver na página, falso se o SIGAA avisar que nenhuma turma foi encontrada.
+
+    Exceções:
+        Exception: Se o SIGAA exibir um erro ou se a tabela de turmas não estiver na página.
+    """
+    resultadoFiltros = obter_erros(page)
+    if resultadoFiltros != 'Nenhum erro encontrado.':
+        if AVISO_SEM_TURMAS in resultadoFiltros.lower():
+            return False
+        raise Exception(f"Erro ao aplicar filtros: {resultadoFiltros}")
+    if page.locator("table[id='lista-turmas']").count() == 0:
+        raise Exception("Tabela de turmas não encontrada.")
+    return True
+
+
+def abrir_consulta(page, logs, params):
+    """
+    Navega até a página "Consultar Turma" e aplica os filtros da consulta monitorada.
+
+    Retorno:
+        bool: O retorno de `verificar_resultado`.
+
+    Exceções:
+        Exception: Se o SIGAA exibir um erro ao aplicar os filtros ou não exibir a tabela de turmas.
+    """
+    navegar_consultar_turma(page, logs)
+    aplicar_filtros(page, logs, params)
+    return verificar_resultado(page)
+
+
+def main(playwright, params):
+    """
+    Monitora a quantidade de alunos das turmas de uma consulta e publica as mudanças.
+
+    A função mantém uma única página autenticada na tabela de resultados. A cada intervalo, a busca é
+    submetida novamente e apenas a coluna de alunos é lida, em uma única chamada ao navegador. As mudanças
+    são publicadas como eventos NDJSON na saída padrão ou enviadas a um webhook. Quando nada muda, o
+    intervalo entre as consultas é multiplicado por 'fatorBackoff' até 'intervaloMaximo'; na primeira
+    mudança, ele volta ao valor de 'intervalo'.
+
+    Parâmetros:
+        playwright (object): Instância do Playwright para automação de navegador.
+        params (dict): Dicionário contendo os parâmetros para a execução, com possíveis chaves:
+            - 'userData' (str): Cookie de autenticação JSESSIONID do usuário no SIGAA.
+            - 'intervalo' (float): Intervalo inicial entre as consultas, em segundos (padrão: 30).
+            - 'intervaloMaximo' (float): Intervalo máximo entre as consultas, em segundos (padrão: 300).
+            - 'fatorBackoff' (float): Fator de aumento do intervalo quando nada muda (padrão: 2).
+            - 'webhook' (str): URL (ex.: http://localhost:8080/vagas) que recebe os eventos por POST.
+            - 'maxConsultas' (int): Encerra o monitoramento após esta quantidade de consultas (padrão: sem limite).
+            - 'maxErrosSeguidos' (int): Encerra o monitoramento após esta quantidade de erros seguidos (padrão: 3).
+            - Demais parâmetros usados para a função `aplicar_filtros` e para `core.criar_contexto`.
+
+    Eventos publicados:
+        - 'inicio': leitura inicial, com a quantidade de alunos de cada turma.
+        - 'alteracao', 'nova', 'removida': mudanças na coluna de alunos de uma turma. Se o SIGAA avisar que
+          nenhuma turma foi encontrada, todas as turmas monitoradas são publicadas como 'removida'.
+        - 'erro': falha em uma consulta (inclusive painel de erros ou tabela ausente após a busca); a leitura
+          não é comparada com a anterior e a página é reaberta na consulta seguinte.
+
+    Retorno:
+        dict: Um dicionário com a quantidade de consultas e de mudanças e os logs da operação.
+        O status é 200 se o monitoramento terminou normalmente e 500 em caso de erro.
+    """
+    logs = []
+    context = None
+    browser = None
+
+    intervalo = float(params.get('intervalo', 30))
+    intervaloMaximo = float(params.get('intervaloMaximo', 300))
+    fatorBackoff = float(params.get('fatorBackoff', 2))
+    webhook = params.get('webhook', '')
+    maxConsultas = params.get('maxConsultas')
+    maxErrosSeguidos = int(params.get('maxErrosSeguidos', 3))
+
+    consultas = 0
+    mudancas = 0
+
+    try:
+        browser = abrir_navegador(playwright, params)
+        context = criar_contexto(browser, params, logs)
+        page = abrir_pagina_autenticada(context, params, logs)
+
+        alunos = ler_alunos(page) if abrir_consulta(page, logs, params) else {}
+        consultas += 1
+        emitir_evento({'evento': 'inicio', 'turmas': alunos}, webhook)
+        logs.append(f"Monitorando {len(alunos)} turma(s).")
+
+        espera = intervalo
+        errosSeguidos = 0
+        paginaValida = True
+
+        while maxConsultas is None or consultas < int(maxConsultas):
+            time.sleep(espera)
+
+            try:
+                if paginaValida:
+                    page.locator('input[id="form:buttonBuscar"]').click()
+                    page.wait_for_load_state()
+                    comTurmas = verificar_resultado(page)
+                else:
+                    comTurmas = abrir_consulta(page, logs, params)
+                # Sem turmas, as turmas monitoradas são publicadas como 'removida'
+                atual = ler_alunos(page) if comTurmas else {}
+                consultas += 1
+                errosSeguidos = 0
+                paginaValida = True
+            except KeyboardInterrupt:
+                raise
+            except Exception as e:
+                errosSeguidos += 1
+                paginaValida = False
+                emitir_evento({'evento': 'erro', 'erro': str(e)}, webhook)
+                if errosSeguidos >= maxErrosSeguidos:
+                    raise
+                continue
+
+            eventos = comparar_alunos(alunos, atual)
+            for evento in eventos:
+                emitir_evento(evento, webhook)
+            alunos = atual
+
+            if eventos:
+                mudancas += len(eventos)
+                espera = intervalo
+            else:
+                espera = min(espera * fatorBackoff, intervaloMaximo)
+
+        logs.append("Monitoramento encerrado.")
+        fechar_contexto(context, params, logs)
+
+        return {
+            'resultado': {
+                'logs': logs,
+                'consultas': consultas,
+                'mudancas': mudancas
+            },
+            'status': 200
+        }
+
+    except KeyboardInterrupt:
+        logs.append("Monitoramento interrompido.")
+        fechar_contexto(context, params, logs)
+        return {
+            'resultado': {
+                'logs': logs,
+                'consultas': consultas,
+                'mudancas': mudancas
+            },
+            'status': 200
+        }
+
+    except Exception as e:
+        logs.append(f"Ocorreu um erro: {str(e)}")
+        fechar_contexto(context, params, logs)
+        return {
+            'resultado': str(e),
+            'status': 500
+        }
+    finally:
+        fechar_navegador(browser, logs)
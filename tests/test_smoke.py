@@ -0,0 +1,333 @@
+import importlib
+
+import pytest
+
+from scraping.checkpoint import chave_consulta
+from scraping.fila import FilaSQLite
+from scraping.indiceAptos import IndiceAlunosAptos
+from scraping.registros import Turma, expandir_compacto, formato_compacto
+from scraping.webscrapingDemandas import extrair_aluno, extrair_dados_tabela
+
+
+MODULOS = (
+    'scraping.cli', 'scraping.core', 'scraping.checkpoint', 'scraping.exportacao', 'scraping.fila',
+    'scraping.indiceAptos', 'scraping.perfilamento', 'scraping.registros', 'scraping.webscraping',
+    'scraping.webscrapingAutentication', 'scraping.webscrapingDemandas', 'scraping.webscrapingVagas'
+)
+
+
+class LocatorFalso:
+    """Locator mínimo que devolve as mesmas linhas para qualquer seletor."""
+
+    def __init__(self, linhas):
+        self.linhas = linhas
+
+    def locator(self, seletor):
+        return self
+
+    def count(self):
+        return 1
+
+    def evaluate_all(self, script):
+        return self.linhas
+
+
+class PaginaFalsa(LocatorFalso):
+    pass
+
+
+@pytest.mark.parametrize('modulo', MODULOS)
+def test_importa_modulos(modulo):
+    importlib.import_module(modulo)
+
+
+def test_extrair_aluno():
+    assert extrair_aluno(['1', '202000012345', '', 'FULANO DE TAL', 'ATIVO']) == '202000012345'
+    assert extrair_aluno(['Total', '3']) is None
+
+
+def test_extrair_dados_tabela_demandas():
+    linhas = [['1', '202000012345', 'FULANO'], ['2', '202000054321', 'CICLANO'], ['Total: 2']]
+    logs = []
+    resultado = extrair_dados_tabela(PaginaFalsa(linhas), logs)
+    assert resultado['alunosAptos'] == 3
+    assert resultado['alunosIdentificados'] == 2
+    assert 'alunos' not in resultado
+    assert not any('erro' in log for log in logs)
+
+    resultado = extrair_dados_tabela(PaginaFalsa(linhas), [], incluirAlunos=True)
+    assert resultado['alunos'] == ['202000012345', '202000054321']
+
+
+def test_chave_consulta_ignora_cookie():
+    assert chave_consulta({'userData': 'a', 'departamento': 'X'}) == chave_consulta({'userData': 'b', 'departamento': 'X'})
+    assert chave_consulta({'departamento': 'X'}) != chave_consulta({'departamento': 'Y'})
+
+
+def test_formato_compacto_ida_e_volta():
+    turmas = [
+        Turma.criar('ARQ', 'COMP1', '2024.1', '01', [{'id': None, 'nome': 'A'}], '60h', '35N12', '56/55 alunos'),
+        Turma.criar('ARQ', 'COMP1', '2024.1', '02', [{'id': None, 'nome': 'A'}], '60h', '24T12', '10/55 alunos')
+    ]
+    compacto = formato_compacto(turmas)
+    assert compacto['docentes'] == ['A']
+    assert len(compacto['disciplinas']) == 1
+    assert list(expandir_compacto(compacto)) == [turma.como_dict() for turma in turmas]
+
+
+def test_indice_alunos_aptos(tmp_path):
+    indice = IndiceAlunosAptos()
+    indice.adicionar('A', ['1', '2', '3'])
+    indice.adicionar('B', ['2', '4'])
+    resumo = indice.resumo()
+    assert resumo['alunosDistintos'] == 4
+    assert resumo['componentes']['A'] == {'aptos': 3, 'exclusivos': 2}
+    assert indice.alunos('A', 'B') == ['2']
+
+    caminho = str(tmp_path / 'aptos.json')
+    indice.salvar(caminho)
+    assert IndiceAlunosAptos.carregar(caminho).resumo() == resumo
+
+
+def test_fila_sqlite(tmp_path):
+    fila = FilaSQLite(str(tmp_path / 'fila.sqlite'))
+    identificador = fila.enfileirar('turmas', {'departamento': 'X'})
+    assert fila.arrendar('w1', 600, 3) == (identificador, 'turmas', {'departamento': 'X'})
+    assert fila.arrendar('w2', 600, 3) is None
+    fila.concluir(identificador, 'w1', {'status': 200}, 3)
+    assert fila.resumo() == {'concluida': 1}
+
+
+def test_executar_consultas_nao_grava_extracao_incompleta(tmp_path, monkeypatch):
+    from scraping import webscraping
+
+    retornos = {
+        'A': {'logs': ['Dados extraídos com sucesso'], 'extracaoConcluida': True, 'turmasEletivas': []},
+        'B': {'logs': ['Erro ao aplicar filtros: Campo obrigatório'], 'extracaoConcluida': False}
+    }
+    monkeypatch.setattr(webscraping, 'main', lambda playwright, params: {'resultado': retornos[params['departamento']], 'status': 200})
+
+    caminho = str(tmp_path / 'coleta.jsonl')
+    retorno = webscraping.executar_consultas(None, {
+        'checkpoint': caminho,
+        'consultas': [{'departamento': 'A'}, {'departamento': 'B'}]
+    })
+    assert retorno['status'] == 500
+    assert retorno['resultado']['consultasConcluidas'] == 1
+    assert webscraping.consultas_pendentes({'checkpoint': caminho, 'consultas': [{'departamento': 'B'}]}) == 1
+
+
+def test_vagas_nao_compara_pagina_sem_tabela(monkeypatch):
+    from scraping import webscrapingVagas
+
+    class PaginaSemTabela(PaginaFalsa):
+        def count(self):
+            return 0
+
+    monkeypatch.setattr(webscrapingVagas, 'obter_erros', lambda page: 'Nenhum erro encontrado.')
+    webscrapingVagas.verificar_resultado(PaginaFalsa([]))
+    with pytest.raises(Exception, match='Tabela de turmas'):
+        webscrapingVagas.verificar_resultado(PaginaSemTabela([]))
+
+    monkeypatch.setattr(webscrapingVagas, 'obter_erros', lambda page: 'Sessão expirada')
+    with pytest.raises(Exception, match='Sessão expirada'):
+        webscrapingVagas.verificar_resultado(PaginaFalsa([]))
+
+    monkeypatch.setattr(webscrapingVagas, 'obter_erros', lambda page: 'Nenhuma turma encontrada com os critérios informados.')
+    assert webscrapingVagas.verificar_resultado(PaginaSemTabela([])) is False
+
+
+def test_vagas_chave_inclui_semestre():
+    from scraping.webscrapingVagas import comparar_alunos, ler_alunos
+
+    linhas = [['2024.1', 'COMP0415', '01', '56/55 alunos'], ['2024.2', 'COMP0415', '01', '10/55 alunos']]
+    alunos = ler_alunos(PaginaFalsa(linhas))
+    assert alunos == {'2024.1-COMP0415-01': '56/55 alunos', '2024.2-COMP0415-01': '10/55 alunos'}
+    assert [evento['evento'] for evento in comparar_alunos(alunos, {})] == ['removida', 'removida']
+
+
+def test_har_separado_por_contexto():
+    from scraping.core import caminho_har, separar_har
+
+    assert caminho_har('data/coleta.har', 'consulta-0') == 'data/coleta-consulta-0.har'
+    assert caminho_har('', 'consulta-0') == ''
+    params = separar_har({'gravarHar': 'data/coleta.zip', 'departamento': 'X'}, 'consulta-1')
+    assert params == {'gravarHar': 'data/coleta-consulta-1.zip', 'departamento': 'X'}
+    # Os caminhos de HAR não fazem parte da chave do checkpoint
+    assert chave_consulta(params) == chave_consulta({'departamento': 'X', 'headless': True})
+
+
+@pytest.mark.parametrize('script', ['webscraping.py', 'webscrapingDemandas.py', 'webscrapingAutentication.py'])
+def test_scripts_executados_diretamente(script):
+    import json
+    import os
+    import subprocess
+    import sys
+
+    raiz = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+    saida = subprocess.run([sys.executable, os.path.join(raiz, 'scraping', script), '{}'], capture_output=True, text=True, check=True)
+    assert json.loads(saida.stdout)['status'] == 400
+
+
+def test_inicializacao_mede_ate_o_playwright(tmp_path, monkeypatch):
+    from scraping.cli import executar_inicializacao
+
+    # Playwright mínimo, para medir as etapas sem o pacote instalado
+    (tmp_path / 'playwright').mkdir()
+    (tmp_path / 'playwright' / '__init__.py').write_text('')
+    (tmp_path / 'playwright' / 'sync_api.py').write_text('def sync_playwright():\n    pass\n')
+    monkeypatch.setenv('PYTHONPATH', str(tmp_path))
+
+    retorno = executar_inicializacao({'repeticoes': 1, 'navegador': False, 'subcomandos': ['turmas']})
+    assert retorno['status'] == 200
+    assert set(retorno['resultado']['turmas']['etapasMs']) == {'moduloMs', 'playwrightMs'}
+
+
+def test_perfilamento_separa_execucoes_seguidas(tmp_path):
+    from scraping.perfilamento import executar_com_perfil
+
+    params = {'perfilamento': {'diretorio': str(tmp_path)}}
+    diretorios = {executar_com_perfil(lambda playwright, params: {'status': 200}, None, params)['perfil'] for _ in range(3)}
+    assert len(diretorios) == 3
+
+
+def test_fila_valida_tarefas_ao_enfileirar(tmp_path):
+    from scraping import fila
+
+    endereco = str(tmp_path / 'fila.sqlite')
+    retorno = fila.main({'acao': 'enfileirar', 'fila': endereco, 'tarefas': [
+        {'tipo': 'turmas', 'params': {'userData': 'cookie'}},
+        {'tipo': 'demandas', 'params': {'userData': 'cookie', 'componenteCurricular': 'COMP0415'}}
+    ]})
+    assert retorno['status'] == 400
+    assert retorno['resultado'].startswith('Tarefa 1:')
+    assert fila.FilaSQLite(endereco).resumo() == {}
+
+    retorno = fila.main({'acao': 'enfileirar', 'fila': endereco, 'tarefas': [
+        {'tipo': 'demandas', 'params': {'userData': 'cookie', 'componenteCurricular': 'COMP0415', 'anoPeriodoIngresso': '2020.1'}}
+    ]})
+    assert retorno['status'] == 200
+
+
+def trabalhador_com_erro(endereco, opcoes):
+    raise SystemExit(3)
+
+
+def test_fila_reporta_trabalhadores_com_erro(tmp_path, monkeypatch):
+    from scraping import fila
+
+    monkeypatch.setattr(fila, 'trabalhar', trabalhador_com_erro)
+    retorno = fila.main({'acao': 'trabalhar', 'fila': str(tmp_path / 'fila.sqlite'), 'trabalhadores': 2})
+    assert retorno['status'] == 500
+    assert 'códigos de saída: [3, 3]' in retorno['resultado']['logs'][-1]
+
+
+def test_executar_consultas_formato_padrao_reaproveita_turmas(tmp_path, monkeypatch):
+    from scraping import webscraping
+
+    turma = Turma.criar('ARQ', 'COMP1', '2024.1', '01', [], None, None, '10/55 alunos').como_dict()
+    monkeypatch.setattr(webscraping, 'main', lambda playwright, params: {
+        'resultado': {'logs': [], 'extracaoConcluida': True, 'turmasEletivas': [turma]},
+        'status': 200
+    })
+
+    retorno = webscraping.executar_consultas(None, {'consultas': [{'departamento': 'A'}]})
+    assert retorno['resultado']['turmasEletivas'][0] is turma
+    compacto = webscraping.executar_consultas(None, {'consultas': [{'departamento': 'A'}], 'formatoSaida': 'compacto'})
+    assert list(expandir_compacto(compacto['resultado'])) == [turma]
+
+
+@pytest.mark.parametrize('modulo', ['scraping.webscraping', 'scraping.webscrapingDemandas', 'scraping.webscrapingAutentication'])
+def test_main_fecha_navegador_em_caso_de_erro(modulo):
+    class Navegador:
+        fechado = False
+
+        def new_context(self, **opcoes):
+            raise Exception('Timeout do SIGAA')
+
+        def close(self):
+            self.fechado = True
+
+    navegador = Navegador()
+    chromium = type('Chromium', (), {'launch': lambda self, **opcoes: navegador})()
+    playwright = type('Playwright', (), {'chromium': chromium})()
+
+    retorno = importlib.import_module(modulo).main(playwright, {'anoPeriodoIngresso': '2020.1'})
+    assert retorno['status'] == 500
+    assert navegador.fechado
+
+
+def test_fila_registra_erro_ao_renovar(capsys):
+    import threading
+    from scraping.fila import renovar_periodicamente
+
+    class FilaIndisponivel:
+        def renovar(self, identificador, trabalhador, visibilidade):
+            parar.set()
+            raise Exception('database is locked')
+
+    parar = threading.Event()
+    renovar_periodicamente(FilaIndisponivel(), 7, 'w1', 0.03, parar)
+    assert 'tarefa 7' in capsys.readouterr().err
+
+
+@pytest.mark.parametrize('params', [
+    {'intervalo': 'abc'}, {'intervalo': 0}, {'intervaloMaximo': 'x'}, {'fatorBackoff': 0.5},
+    {'maxErrosSeguidos': 0}, {'maxConsultas': 'x'}, {'maxConsultas': 1.5}
+])
+def test_vagas_valida_parametros_numericos(params):
+    from scraping.cli import executar_vagas
+
+    retorno = executar_vagas({'userData': 'cookie', **params})
+    assert retorno['status'] == 400
+    assert repr(next(iter(params))) in retorno['resultado']
+
+
+@pytest.mark.parametrize('tamanhoLote', ['abc', 0, -1, 1.5, True, None])
+def test_exportar_valida_tamanho_lote(tamanhoLote):
+    from scraping.exportacao import exportar
+
+    retorno = exportar({'entrada': 'data/dados_tabela.csv', 'saida': 'turmas.parquet', 'tamanhoLote': tamanhoLote})
+    assert retorno['status'] == 400
+    assert 'tamanhoLote' in retorno['resultado']
+
+
+def test_indice_e_checkpoint_no_formato_dos_subcomandos(tmp_path):
+    from scraping.checkpoint import registrar_consulta
+    from scraping.cli import executar_checkpoint, executar_indice
+
+    caminho = str(tmp_path / 'aptos.json')
+    indice = IndiceAlunosAptos()
+    indice.adicionar('A', ['1', '2'])
+    indice.adicionar('B', ['2'])
+    indice.salvar(caminho)
+
+    assert executar_indice({'indice': caminho})['resultado']['alunosDistintos'] == 2
+    assert executar_indice({'indice': caminho, 'componentes': ['A', 'B']}) == {
+        'resultado': {'componentes': ['A', 'B'], 'alunos': 1, 'matriculas': ['2']},
+        'status': 200
+    }
+    assert executar_indice({'indice': caminho, 'componentes': 'AB'})['status'] == 400
+
+    checkpoint = str(tmp_path / 'coleta.jsonl')
+    registrar_consulta(checkpoint, {'departamento': 'X'}, {'turmasEletivas': []})
+    retorno = executar_checkpoint({'checkpoint': checkpoint})
+    assert retorno['status'] == 200
+    assert retorno['resultado']['consultasConcluidas'] == 1
+
+
+@pytest.mark.parametrize('perfilamento', [{'amostragem': 'x'}, {'amostragem': 2}, {'top': 0}, {'top': 'abc'}, 'sim'])
+def test_perfilamento_invalido_nao_inicia_playwright(perfilamento):
+    from scraping.cli import executar_com_playwright
+
+    retorno = executar_com_playwright(None, {'perfilamento': perfilamento})
+    assert retorno['status'] == 400
+    assert 'perfilamento' in retorno['resultado']
+
+
+def test_perfilamento_valido():
+    from scraping.perfilamento import validar_perfilamento
+
+    assert validar_perfilamento({}) is None
+    assert validar_perfilamento({'perfilamento': True}) is None
+    assert validar_perfilamento({'perfilamento': {'amostragem': 0.05, 'top': 10, 'diretorio': 'perfis'}}) is None